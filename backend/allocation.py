@@ -0,0 +1,367 @@
+# backend/allocation.py
+# Allocation engine: decides which faculty invigilate which venue for each
+# (date, time_slot). The solvers work on plain ids and tuples so a whole exam
+# period can be planned in memory before anything is written to the database.
+import heapq
+import math
+import random
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from sqlalchemy import delete, func, insert, update
+
+from model import db, Attendance, Faculty, Venue, VenueAllocation
+from rfid_index import rfid_index
+from cache import response_cache
+from availability import availability_index
+import summary
+
+TIME_SLOTS = ('08:00-12:00', '12:00-15:00')
+
+SOLVERS = {}
+
+
+class AllocationError(Exception):
+    pass
+
+
+def register_solver(name):
+    def decorator(fn):
+        SOLVERS[name] = fn
+        return fn
+    return decorator
+
+
+def date_range(start_date, end_date):
+    days = (end_date - start_date).days
+    return [start_date + timedelta(days=i) for i in range(days + 1)]
+
+
+def venue_requirements(venues, faculty_per_venue, scale_by_capacity=False):
+    """Return [(venue_id, faculty_needed)] for venues given as (venue_id, capacity).
+
+    With scale_by_capacity the same total (venues * faculty_per_venue) is split
+    in proportion to capacity using largest remainders, with at least one
+    invigilator per venue.
+    """
+    if not scale_by_capacity or not venues:
+        return [(venue_id, faculty_per_venue) for venue_id, _ in venues]
+
+    total = len(venues) * faculty_per_venue
+    total_capacity = sum(max(capacity or 0, 0) for _, capacity in venues)
+    if total_capacity == 0:
+        return [(venue_id, faculty_per_venue) for venue_id, _ in venues]
+
+    shares = [total * max(capacity or 0, 0) / total_capacity for _, capacity in venues]
+    counts = [max(1, math.floor(share)) for share in shares]
+    remaining = total - sum(counts)
+    by_remainder = sorted(range(len(venues)), key=lambda i: shares[i] - math.floor(shares[i]), reverse=True)
+    for i in by_remainder[:max(remaining, 0)]:
+        counts[i] += 1
+    # Raising small venues to one can overshoot; take the excess back from
+    # the venues with the most invigilators
+    while remaining < 0:
+        largest = max(range(len(venues)), key=lambda i: (counts[i], shares[i]))
+        if counts[largest] <= 1:
+            break
+        counts[largest] -= 1
+        remaining += 1
+    return [(venue_id, count) for (venue_id, _), count in zip(venues, counts)]
+
+
+def day_loads(booked):
+    # Per-date duty counters, starting from the duties already booked in
+    # other slots of the same day
+    return defaultdict(Counter, {date: Counter(counts) for date, counts in booked.items()})
+
+
+@register_solver('greedy')
+def greedy_solver(requirements, faculty_ids, slots, history, booked, max_per_day, unavailable, rng):
+    # Each slot takes the least loaded available faculty: fewest duties that
+    # day first, then fewest duties overall (history included), random among
+    # equals.
+    needed = sum(count for _, count in requirements)
+    duties = Counter(history)
+    day_load = day_loads(booked)
+    rows = []
+    for date, time_slot in slots:
+        today = day_load[date]
+        blocked = unavailable.get((date, time_slot), ())
+        if max_per_day is None and not blocked:
+            eligible = faculty_ids
+        else:
+            eligible = [f for f in faculty_ids
+                        if (max_per_day is None or today[f] < max_per_day) and f not in blocked]
+        if len(eligible) < needed:
+            raise AllocationError(
+                f'Not enough faculty available on {date.isoformat()} {time_slot}: '
+                f'{needed} needed, but only {len(eligible)} available'
+            )
+        chosen = heapq.nsmallest(needed, eligible, key=lambda f: (today[f], duties[f], rng.random()))
+        index = 0
+        for venue_id, count in requirements:
+            for faculty_id in chosen[index:index + count]:
+                rows.append((faculty_id, venue_id, date, time_slot))
+                duties[faculty_id] += 1
+                today[faculty_id] += 1
+            index += count
+    return rows
+
+
+@register_solver('random')
+def random_solver(requirements, faculty_ids, slots, history, booked, max_per_day, unavailable, rng):
+    # The original behaviour: shuffle and fill venues in order, ignoring load
+    # (but not unavailability or the per-day limit).
+    needed = sum(count for _, count in requirements)
+    day_load = day_loads(booked)
+    rows = []
+    for date, time_slot in slots:
+        today = day_load[date]
+        blocked = unavailable.get((date, time_slot), ())
+        shuffled = [f for f in faculty_ids
+                    if f not in blocked and (max_per_day is None or today[f] < max_per_day)]
+        if len(shuffled) < needed:
+            raise AllocationError(
+                f'Not enough faculty available on {date.isoformat()} {time_slot}: '
+                f'{needed} needed, but only {len(shuffled)} available'
+            )
+        rng.shuffle(shuffled)
+        index = 0
+        for venue_id, count in requirements:
+            for faculty_id in shuffled[index:index + count]:
+                rows.append((faculty_id, venue_id, date, time_slot))
+                today[faculty_id] += 1
+            index += count
+    return rows
+
+
+def plan_allocations(venues, faculty_ids, slots, faculty_per_venue, history=None, strategy='greedy',
+                     scale_by_capacity=False, max_per_day=None, seed=None, unavailable=None, booked=None):
+    """Plan allocations for every (date, time_slot) in slots.
+
+    unavailable maps (date, time_slot) to faculty ids that can't be used there;
+    booked maps a date to {faculty_id: duties} already held that day outside
+    slots, which count towards max_per_day.
+    Returns a list of (faculty_id, venue_id, date, time_slot) tuples.
+    """
+    if strategy not in SOLVERS:
+        raise AllocationError(f'Unknown allocation strategy: {strategy}')
+    if faculty_per_venue < 1:
+        raise AllocationError('faculty_per_venue must be at least 1')
+    requirements = venue_requirements(venues, faculty_per_venue, scale_by_capacity)
+    needed = sum(count for _, count in requirements)
+    if len(faculty_ids) < needed:
+        raise AllocationError(f'Not enough faculty available: {needed} needed, but only {len(faculty_ids)} available')
+    return SOLVERS[strategy](requirements, list(faculty_ids), list(slots), history or {}, booked or {},
+                             max_per_day, unavailable or {}, random.Random(seed))
+
+
+def load_history(slots):
+    """Return (history, booked) from existing allocations.
+
+    history counts duties per faculty, excluding the slots about to be
+    regenerated so a rerun doesn't count its own previous result. booked maps
+    each date in slots to {faculty_id: duties} in that day's other slots.
+    """
+    history = Counter(dict(
+        db.session.query(VenueAllocation.faculty_id, func.count(VenueAllocation.allocation_id))
+        .group_by(VenueAllocation.faculty_id)
+        .all()
+    ))
+    booked = defaultdict(Counter)
+    if slots:
+        dates = {date for date, _ in slots}
+        targets = set(slots)
+        existing = db.session.query(VenueAllocation.faculty_id, VenueAllocation.date, VenueAllocation.time_slot) \
+            .filter(VenueAllocation.date.between(min(dates), max(dates))) \
+            .all()
+        for faculty_id, date, time_slot in existing:
+            if (date, time_slot) in targets:
+                history[faculty_id] -= 1
+            elif date in dates:
+                booked[date][faculty_id] += 1
+    return history, dict(booked)
+
+
+def generate(slots, faculty_per_venue, **options):
+    """Plan allocations for slots from the current venues, faculty and history."""
+    venues = db.session.query(Venue.venue_id, Venue.capacity).order_by(Venue.venue_id).all()
+    faculty_ids = [f for (f,) in db.session.query(Faculty.faculty_id).filter(Faculty.is_admin.is_(False)).all()]
+    history, booked = load_history(slots)
+    unavailable = availability_index.unavailable(slots)
+    return plan_allocations(venues, faculty_ids, slots, faculty_per_venue, history=history, booked=booked,
+                            unavailable=unavailable, **options)
+
+
+def replace_allocations(slots, rows):
+    """Delete existing allocations for slots and insert rows. Does not commit."""
+    dates = sorted({date for date, _ in slots})
+    time_slots = sorted({time_slot for _, time_slot in slots})
+    VenueAllocation.query.filter(
+        VenueAllocation.date.in_(dates),
+        VenueAllocation.time_slot.in_(time_slots)
+    ).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(insert(VenueAllocation), [
+            {'faculty_id': faculty_id, 'venue_id': venue_id, 'date': date, 'time_slot': time_slot}
+            for faculty_id, venue_id, date, time_slot in rows
+        ])
+    summary.refresh(dates, time_slots)
+
+
+# Incremental regeneration: instead of replacing every allocation in the
+# slots, keep the current assignment wherever it is still valid and change
+# only what has to change. Allocations with attendance are never touched.
+
+def load_current(slots):
+    """Return {(date, time_slot): [(allocation_id, faculty_id, venue_id, attended)]}."""
+    dates = sorted({date for date, _ in slots})
+    targets = set(slots)
+    attended = db.session.query(Attendance.allocation_id) \
+        .join(VenueAllocation, VenueAllocation.allocation_id == Attendance.allocation_id) \
+        .filter(VenueAllocation.date.in_(dates))
+    attended = {allocation_id for (allocation_id,) in attended}
+    current = defaultdict(list)
+    rows = db.session.query(VenueAllocation.allocation_id, VenueAllocation.faculty_id, VenueAllocation.venue_id,
+                            VenueAllocation.date, VenueAllocation.time_slot) \
+        .filter(VenueAllocation.date.in_(dates)) \
+        .order_by(VenueAllocation.allocation_id)
+    for allocation_id, faculty_id, venue_id, date, time_slot in rows:
+        if (date, time_slot) in targets:
+            current[(date, time_slot)].append((allocation_id, faculty_id, venue_id, allocation_id in attended))
+    return current
+
+
+def plan_changes(requirements, faculty_ids, slots, current, history, booked, max_per_day, unavailable, rng):
+    """Work out the smallest set of writes that meets requirements in every slot.
+
+    Per slot, current allocations are kept while their faculty is still
+    eligible and under max_per_day and their venue still needs them; surplus
+    ones move to venues that are short, and the rest of the shortfall goes to
+    the least loaded free faculty, reusing rows of dropped allocations before
+    inserting new ones. booked is as for plan_allocations. Returns
+    dict(insert=[...], update=[...], delete=[...], unchanged=n).
+    """
+    all_eligible = set(faculty_ids)
+    duties = Counter(history)
+    day_load = day_loads(booked)
+    plans = []
+
+    # Settle what stays first, so the load of every kept allocation is known
+    # before any slot is filled.
+    for date, time_slot in slots:
+        need = Counter(dict(requirements))
+        blocked = unavailable.get((date, time_slot), set())
+        eligible = all_eligible - blocked if blocked else all_eligible
+        kept, surplus, dropped = [], [], []
+        in_slot = set()
+        today = day_load[date]
+        for row in sorted(current.get((date, time_slot), []), key=lambda row: not row[3]):
+            allocation_id, faculty_id, venue_id, attended = row
+            in_slot.add(faculty_id)
+            fits = faculty_id in eligible and (max_per_day is None or today[faculty_id] < max_per_day)
+            if attended or (fits and need[venue_id] > 0):
+                kept.append(row)
+                need[venue_id] -= 1
+                duties[faculty_id] += 1
+                today[faculty_id] += 1
+            elif fits:
+                surplus.append(row)
+            else:
+                dropped.append(row)
+        plans.append((date, time_slot, need, kept, surplus, dropped, in_slot | blocked))
+
+    changes = {'insert': [], 'update': [], 'delete': [], 'unchanged': 0}
+    for date, time_slot, need, kept, surplus, dropped, excluded in plans:
+        changes['unchanged'] += len(kept)
+        short = [venue_id for venue_id, _ in requirements for _ in range(max(need[venue_id], 0))]
+        today = day_load[date]
+
+        # Surplus faculty already sit in this slot; move them where they are needed
+        while short and surplus:
+            allocation_id, faculty_id, _, _ = surplus.pop(0)
+            changes['update'].append({'allocation_id': allocation_id, 'faculty_id': faculty_id, 'venue_id': short.pop(0)})
+            duties[faculty_id] += 1
+            today[faculty_id] += 1
+        dropped.extend(surplus)
+
+        if short:
+            candidates = [f for f in faculty_ids if f not in excluded and (max_per_day is None or today[f] < max_per_day)]
+            if len(candidates) < len(short):
+                raise AllocationError(
+                    f'Not enough faculty available on {date.isoformat()} {time_slot}: '
+                    f'{len(short)} more needed, but only {len(candidates)} available'
+                )
+            chosen = heapq.nsmallest(len(short), candidates, key=lambda f: (today[f], duties[f], rng.random()))
+            for faculty_id, venue_id in zip(chosen, short):
+                if dropped:
+                    allocation_id = dropped.pop(0)[0]
+                    changes['update'].append({'allocation_id': allocation_id, 'faculty_id': faculty_id, 'venue_id': venue_id})
+                else:
+                    changes['insert'].append({'faculty_id': faculty_id, 'venue_id': venue_id, 'date': date, 'time_slot': time_slot})
+                duties[faculty_id] += 1
+                today[faculty_id] += 1
+        changes['delete'].extend(allocation_id for allocation_id, _, _, _ in dropped)
+    return changes
+
+
+def diff_allocations(slots, faculty_per_venue, scale_by_capacity=False, max_per_day=None, seed=None, **options):
+    """Plan the changes that bring slots in line with the current venues and faculty.
+
+    Filling uses the greedy least-loaded rule whatever strategy is requested.
+    """
+    if faculty_per_venue < 1:
+        raise AllocationError('faculty_per_venue must be at least 1')
+    venues = db.session.query(Venue.venue_id, Venue.capacity).order_by(Venue.venue_id).all()
+    faculty_ids = [f for (f,) in db.session.query(Faculty.faculty_id).filter(Faculty.is_admin.is_(False)).all()]
+    requirements = venue_requirements(venues, faculty_per_venue, scale_by_capacity)
+    history, booked = load_history(slots)
+    return plan_changes(requirements, faculty_ids, list(slots), load_current(slots), history, booked,
+                        max_per_day, availability_index.unavailable(slots), random.Random(seed))
+
+
+def apply_changes(slots, changes):
+    """Write planned changes and refresh the summary. Does not commit."""
+    # Deletes go first so reused faculty never collide on the unique key
+    if changes['delete']:
+        db.session.execute(delete(VenueAllocation).where(VenueAllocation.allocation_id.in_(changes['delete'])))
+    if changes['update']:
+        db.session.execute(update(VenueAllocation), changes['update'])
+    if changes['insert']:
+        db.session.execute(insert(VenueAllocation), changes['insert'])
+    summary.refresh(sorted({date for date, _ in slots}), sorted({time_slot for _, time_slot in slots}))
+    return {
+        'inserted': len(changes['insert']),
+        'updated': len(changes['update']),
+        'deleted': len(changes['delete']),
+        'unchanged': changes['unchanged'],
+        'rows_changed': len(changes['insert']) + len(changes['update']) + len(changes['delete'])
+    }
+
+
+def group_by_date(slots, rows):
+    day_slots = defaultdict(list)
+    day_rows = defaultdict(list)
+    for date, time_slot in slots:
+        day_slots[date].append((date, time_slot))
+    for row in rows:
+        day_rows[row[2]].append(row)
+    return [(date, day_slots[date], day_rows[date]) for date in sorted(day_slots)]
+
+
+def run_generation_job(job, slots, faculty_per_venue, options):
+    # Plan the whole period up front (one read, balanced across all days),
+    # then write it one day per transaction so venue_allocations is never
+    # locked for long and check-ins keep flowing.
+    rows = generate(slots, faculty_per_venue, **options)
+    db.session.rollback()
+    for date, day_slots, day_rows in group_by_date(slots, rows):
+        replace_allocations(day_slots, day_rows)
+        db.session.commit()
+        rfid_index.invalidate_dates([date])
+        response_cache.invalidate('attendance')
+        job.advance({
+            'date': date.isoformat(),
+            'time_slots': [time_slot for _, time_slot in day_slots],
+            'count': len(day_rows)
+        })
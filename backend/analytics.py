@@ -0,0 +1,123 @@
+# backend/analytics.py
+# Attendance analytics computed with NumPy over columns read in bulk: one
+# Core select returns (faculty_id, venue_id, present) per allocation, which
+# becomes three arrays, and every statistic below is a bincount or a sort
+# over those arrays rather than a loop over rows or ORM objects.
+#
+# Only allocations up to today count (future duties can't be missed yet).
+# Reports are cached in response_cache under the 'attendance', 'faculty'
+# and 'venues' namespaces, so they are recomputed after new attendance,
+# regenerated allocations or faculty/venue changes.
+from datetime import datetime
+
+from sqlalchemy import and_, select, union_all
+
+from cache import response_cache
+from model import db, Attendance, AttendanceArchive, Faculty, Venue, VenueAllocation, VenueAllocationArchive
+import archive
+
+
+def allocation_rows(start_date, end_date):
+    """Return (faculty_id, venue_id, present) per allocation."""
+    def restrict(query, date_column):
+        if start_date:
+            query = query.where(date_column >= start_date)
+        return query.where(date_column <= end_date)
+
+    query = restrict(select(VenueAllocation.faculty_id, VenueAllocation.venue_id, Attendance.id.isnot(None))
+                     .outerjoin(Attendance, and_(Attendance.allocation_id == VenueAllocation.allocation_id,
+                                                 Attendance.is_present.is_(True))), VenueAllocation.date)
+    if archive.reaches_archive(start_date, end_date):
+        archived = restrict(select(VenueAllocationArchive.faculty_id, VenueAllocationArchive.venue_id,
+                                   AttendanceArchive.id.isnot(None))
+                            .outerjoin(AttendanceArchive, and_(
+                                AttendanceArchive.allocation_id == VenueAllocationArchive.allocation_id,
+                                AttendanceArchive.is_present.is_(True))), VenueAllocationArchive.date)
+        query = union_all(query, archived)
+    return db.session.execute(query).all()
+
+
+def gini(values):
+    # 0 when every faculty member has the same number of duties, towards 1
+    # as they concentrate on a few
+    if len(values) == 0 or values.sum() == 0:
+        return 0.0
+    cumulative = values.copy()
+    cumulative.sort()
+    cumulative = cumulative.cumsum()
+    n = len(values)
+    return float((n + 1 - 2 * cumulative.sum() / cumulative[-1]) / n)
+
+
+def compute(start_date=None, end_date=None):
+    # NumPy is only imported once a report is built (startup.py warms it in
+    # the background), so workers that never serve analytics don't load it
+    import numpy as np
+
+    def rates_by(keys, present):
+        # Allocations, present count and absence rate per distinct key
+        unique, inverse = np.unique(keys, return_inverse=True)
+        allocated = np.bincount(inverse, minlength=len(unique))
+        attended = np.bincount(inverse, weights=present, minlength=len(unique)).astype(np.int64)
+        return unique, allocated, attended, 1 - attended / allocated
+
+    end_date = min(end_date, datetime.now().date()) if end_date else datetime.now().date()
+    rows = allocation_rows(start_date, end_date)
+    columns = list(zip(*rows)) or [(), (), ()]
+    faculty_ids, venue_ids, present = (np.fromiter(column, dtype=dtype, count=len(rows))
+                                       for column, dtype in zip(columns, (np.int64, np.int64, bool)))
+
+    names = dict(db.session.query(Faculty.faculty_id, Faculty.name).all())
+    faculty, allocated, attended, absence = rates_by(faculty_ids, present)
+    by_faculty = [{
+        'faculty_id': int(f), 'faculty_name': names.get(int(f)), 'allocated': int(a),
+        'present': int(p), 'absent': int(a - p), 'absence_rate': round(float(r), 4)
+    } for f, a, p, r in zip(faculty, allocated, attended, absence)]
+    by_faculty.sort(key=lambda row: (-row['absence_rate'], -row['absent'], row['faculty_id']))
+
+    venue_names = dict(db.session.query(Venue.venue_id, Venue.name).all())
+    venues, venue_allocated, venue_attended, no_show = rates_by(venue_ids, present)
+    by_venue = [{
+        'venue_id': int(v), 'venue_name': venue_names.get(int(v)), 'allocated': int(a),
+        'present': int(p), 'no_show_rate': round(float(r), 4)
+    } for v, a, p, r in zip(venues, venue_allocated, venue_attended, no_show)]
+    by_venue.sort(key=lambda row: (-row['no_show_rate'], row['venue_id']))
+
+    # Fairness covers every non-admin faculty member, including those with
+    # no duties at all in the range
+    eligible = np.array([f for (f,) in db.session.query(Faculty.faculty_id).filter(Faculty.is_admin.is_(False))],
+                        dtype=np.int64)
+    duties = np.zeros(len(eligible), dtype=np.int64)
+    if len(faculty):
+        positions = np.minimum(np.searchsorted(faculty, eligible), len(faculty) - 1)
+        found = faculty[positions] == eligible
+        duties[found] = allocated[positions[found]]
+    mean = float(duties.mean()) if len(duties) else 0.0
+    fairness = {
+        'faculty': int(len(duties)),
+        'total_duties': int(duties.sum()),
+        'mean': round(mean, 4),
+        'variance': round(float(duties.var()), 4) if len(duties) else 0.0,
+        'std': round(float(duties.std()), 4) if len(duties) else 0.0,
+        'coefficient_of_variation': round(float(duties.std()) / mean, 4) if mean else 0.0,
+        'gini': round(gini(duties), 4),
+        'min': int(duties.min()) if len(duties) else 0,
+        'max': int(duties.max()) if len(duties) else 0
+    }
+
+    total = int(len(present))
+    return {
+        'start_date': start_date.isoformat() if start_date else None,
+        'end_date': end_date.isoformat(),
+        'allocations': total,
+        'present': int(present.sum()),
+        'absence_rate': round(1 - float(present.mean()), 4) if total else 0.0,
+        'by_faculty': by_faculty,
+        'by_venue': by_venue,
+        'fairness': fairness
+    }
+
+
+def report(start_date=None, end_date=None):
+    key = f"analytics:{start_date or ''}:{end_date or ''}:{datetime.now().date()}"
+    return response_cache.get_or_set(['attendance', 'faculty', 'venues'], key, lambda: compute(start_date, end_date))
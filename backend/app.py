@@ -1,57 +1,127 @@
-from flask import Flask, request, jsonify, send_file
-from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from config import Config
+from flask import Blueprint, Flask, current_app, request, jsonify
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity, verify_jwt_in_request
+from config import Config, engine_options, read_bind
 import logging
-from model import db, Faculty, Attendance, Venue, VenueAllocation
+from model import db, Faculty, FacultyUnavailability, Attendance, Venue, VenueAllocation
 from datetime import datetime
 from flask_cors import CORS
-import random
-import openpyxl
-from io import BytesIO
 import re
+import click
 from flask import Response
-
-app = Flask(__name__)
-
-CORS(app, resources={
-    r"/api/*": {
-        "origins": ["http://localhost:5173"],
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Authorization", "Content-Type"],
-        "supports_credentials": True
-    }
-})
-
-app.config.from_object(Config)
-db.init_app(app)
-jwt = JWTManager(app)
-logging.basicConfig(level=logging.DEBUG)
+import allocation as allocation_engine
+from allocation import AllocationError, TIME_SLOTS, date_range
+from jobs import jobs
+import exports
+import importer
+import migrations
+import summary
+import archive
+import analytics
+import directory
+from importer import ImportFormatError
+from directory import DirectoryError
+from rfid_index import rfid_index, NOT_MARKED, PRESENT
+from availability import availability_index
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from bulk import upsert
+from cache import response_cache
+from events import attendance_feed, sse_message
+import time
+import transactions
+import startup
+import hmac
+from metrics import metrics
+from auth import admin_required, current_faculty_id, current_is_admin, is_token_revoked, issue_token, revoke_current_token, role_cache, token_blocklist
+
+api = Blueprint('api', __name__, cli_group=None)
+jwt = JWTManager()
+logging.basicConfig(level=Config.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-# Create tables only once at startup
-with app.app_context():
-    db.create_all()
+def create_app(config_object=Config):
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    if app.config.get('DB_AUTOCOMMIT_READS', True):
+        app.config.setdefault('SQLALCHEMY_BINDS', {})
+        app.config['SQLALCHEMY_BINDS'].setdefault('read', read_bind(app.config))
+
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": ["http://localhost:5173"],
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Authorization", "Content-Type"],
+            "expose_headers": ["X-Next-Cursor", "ETag"],
+            "supports_credentials": True
+        }
+    })
 
-@app.before_request
+    db.init_app(app)
+    jwt.init_app(app)
+    jobs.init_app(app)
+    rfid_index.init_app(app)
+    availability_index.init_app(app)
+    response_cache.init_app(app)
+    attendance_feed.init_app(app)
+    transactions.init_app(app)
+    role_cache.init_app(app)
+    token_blocklist.init_app(app)
+    metrics.init_app(app)
+    metrics.add_collector('transactions', transactions.transaction_stats.snapshot)
+    metrics.add_collector('response_cache', response_cache.stats)
+    metrics.add_collector('rfid_index', rfid_index.stats)
+    metrics.add_collector('availability_index', availability_index.stats)
+    app.register_blueprint(api)
+    # The schema is created and upgraded by `flask --app app migrate`, not on
+    # every worker boot
+    startup.init_app(app)
+    return app
+
+@api.cli.command('migrate')
+def migrate_command():
+    """Create missing tables, indexes and unique keys on an existing database."""
+    for line in migrations.upgrade():
+        print(line)
+
+@api.cli.command('rebuild-summary')
+def rebuild_summary_command():
+    """Recompute the attendance_summary rollup from allocations and attendance."""
+    rows = summary.rebuild()
+    db.session.commit()
+    print(f'attendance_summary: {rows} rows')
+
+@api.cli.command('archive')
+@click.option('--before', 'cutoff', required=True, help='Archive allocations and attendance dated before this day (YYYY-MM-DD).')
+@click.option('--batch-size', default=archive.BATCH_SIZE, show_default=True)
+def archive_command(cutoff, batch_size):
+    """Move closed terms into the archive tables."""
+    cutoff = parse_date(cutoff)
+    if cutoff > datetime.now().date():
+        raise click.BadParameter('must not be in the future', param_hint='--before')
+    moved = archive.archive_before(cutoff, batch_size, progress=lambda table, count: print(f'{table}: {count} rows moved'))
+    rfid_index.invalidate_dates()
+    print(f"Archived {moved['allocations']} allocations and {moved['attendance']} attendance rows dated before {cutoff}")
+
+@api.before_app_request
 def handle_preflight():
     if request.method == "OPTIONS":
-        response = app.make_response("")
+        response = current_app.make_response("")
         response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
         response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
         response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
         response.headers["Access-Control-Max-Age"] = "3600"
         return response
 
-@app.after_request
+@api.after_app_request
 def after_request(response):
     response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
     response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-    db.session.commit()
-    db.session.remove()
     return response
 
+jwt.token_in_blocklist_loader(is_token_revoked)
+
 @jwt.unauthorized_loader
 def unauthorized_response(callback):
     logger.error(f"Unauthorized access: {callback}")
@@ -67,8 +137,18 @@ def expired_token_response(jwt_header, jwt_payload):
     logger.error(f"Expired token: {jwt_payload}")
     return jsonify({'message': 'Token has expired'}), 401
 
+@jwt.revoked_token_loader
+def revoked_token_response(jwt_header, jwt_payload):
+    return jsonify({'message': 'Token has been revoked'}), 401
+
+def faculty_changed():
+    # Drop everything derived from the faculty table after a committed write
+    rfid_index.invalidate_faculty()
+    role_cache.invalidate()
+    response_cache.invalidate('faculty')
+
 # Login API
-@app.route('/api/login', methods=['POST'])
+@api.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
     email = data.get('email')
@@ -78,7 +158,7 @@ def login():
     if not faculty or faculty.mobile_number != password:
         return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
 
-    access_token = create_access_token(identity=str(faculty.faculty_id))
+    access_token = issue_token(faculty)
     return jsonify({
         'success': True,
         'token': access_token,
@@ -87,27 +167,50 @@ def login():
     })
 
 # Logout API (client-side token removal)
-@app.route('/api/logout', methods=['POST'])
+@api.route('/api/logout', methods=['POST'])
 @jwt_required()
 def logout():
+    revoke_current_token()
+    db.session.commit()
     return jsonify({'success': True, 'message': 'Logged out successfully'})
 
-@app.route('/api/current_user', methods=['GET'])
+@api.route('/api/current_user', methods=['GET'])
 @jwt_required()
 def get_current_user():
     faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty:
+
+    def build():
+        faculty = db.session.get(Faculty, faculty_id)
+        if not faculty:
+            return None
+        return {
+            'id': faculty.faculty_id,
+            'name': faculty.name,
+            'email': faculty.email_id,
+            'is_admin': faculty.is_admin
+        }
+
+    response = response_cache.json_response(['faculty'], f'current_user:{faculty_id}', build)
+    if response is None:
         return jsonify({'message': 'User not found'}), 404
-    return jsonify({
-        'id': faculty.faculty_id,
-        'name': faculty.name,
-        'email': faculty.email_id,
-        'is_admin': faculty.is_admin
-    })
+    return response
 
 # Mark Attendance
-@app.route('/api/attendance', methods=['POST'])
+RFID_PATTERN = re.compile(r'^\d{10}$')
+
+def publish_present(allocations):
+    marked_at = datetime.now().isoformat(timespec='seconds')
+    attendance_feed.publish([{
+        'allocation_id': a.allocation_id,
+        'faculty_id': a.faculty_id,
+        'venue_id': a.venue_id,
+        'date': a.date.isoformat(),
+        'time_slot': a.time_slot,
+        'is_present': True,
+        'marked_at': marked_at
+    } for a in allocations])
+
+@api.route('/api/attendance', methods=['POST'])
 @jwt_required()
 def mark_attendance():
     data = request.get_json()
@@ -117,159 +220,388 @@ def mark_attendance():
 
     if not allocation_id:
         return jsonify({'success': False, 'message': 'Allocation ID is required'}), 400
+    try:
+        allocation_id = int(allocation_id)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Allocation ID must be a number'}), 400
 
+    # Tags, faculty and the day's allocations come from the in-memory index;
+    # only the attendance write below touches the database on a warm index.
     if rfid_tag:
-        if not re.match(r'^\d{10}$', rfid_tag):
+        if not RFID_PATTERN.match(rfid_tag):
             return jsonify({'success': False, 'message': 'RFID must be a 10-digit number'}), 400
-        faculty = Faculty.query.filter_by(rfid_tag=rfid_tag).first()
-        if not faculty:
+        faculty_id = rfid_index.faculty_for_tag(rfid_tag)
+        if faculty_id is None:
             return jsonify({'success': False, 'message': 'Faculty not found with this RFID'}), 404
-        faculty_id = faculty.faculty_id
     else:
-        faculty_id = get_jwt_identity()
-        faculty = db.session.get(Faculty, faculty_id)
-        if not faculty:
+        faculty_id = current_faculty_id()
+        if not rfid_index.has_faculty(faculty_id):
             return jsonify({'success': False, 'message': 'Faculty not found'}), 404
 
     # Verify the allocation exists and matches the faculty and date
-    allocation = db.session.get(VenueAllocation, allocation_id)
-    if not allocation or allocation.faculty_id != faculty_id or allocation.date != date:
+    allocation = rfid_index.get_allocation(date, allocation_id)
+    if not allocation or allocation.faculty_id != faculty_id:
         return jsonify({'success': False, 'message': 'Invalid allocation for this faculty or date'}), 404
 
     # Check if attendance is already marked for this allocation
-    attendance = Attendance.query.filter_by(allocation_id=allocation_id).first()
-    if attendance:
-        if attendance.is_present:
-            return jsonify({'success': False, 'message': 'Attendance already marked for this allocation'}), 400
-        attendance.is_present = True
-    else:
-        attendance = Attendance(
-            faculty_id=faculty_id,
-            allocation_id=allocation_id,
-            date=date,
-            is_present=True
-        )
-        db.session.add(attendance)
+    previous = rfid_index.claim(date, allocation_id)
+    if previous is PRESENT:
+        return jsonify({'success': False, 'message': 'Attendance already marked for this allocation'}), 400
 
-    db.session.commit()
+    try:
+        if previous is NOT_MARKED:
+            db.session.execute(insert(Attendance).values(
+                faculty_id=faculty_id,
+                allocation_id=allocation_id,
+                date=date,
+                is_present=True
+            ))
+        else:
+            db.session.execute(update(Attendance)
+                               .where(Attendance.allocation_id == allocation_id)
+                               .values(is_present=True))
+        summary.record_present([allocation])
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        # Another worker inserted the row first (uq_attendance_allocation)
+        if db.session.query(Attendance.id).filter(Attendance.allocation_id == allocation_id).first():
+            return jsonify({'success': False, 'message': 'Attendance already marked for this allocation'}), 400
+        # Otherwise the index is stale and the allocation was deleted (FK failure)
+        rfid_index.invalidate_dates([date])
+        return jsonify({'success': False, 'message': 'Invalid allocation for this faculty or date'}), 404
+    except Exception:
+        db.session.rollback()
+        rfid_index.release(date, allocation_id, previous)
+        raise
+    response_cache.invalidate('attendance')
+    publish_present([allocation])
     return jsonify({'success': True, 'message': 'Attendance marked successfully'})
-# Get Attendance Records (Admin only)
-@app.route('/api/attendance_records', methods=['GET'])
+
+ATTENDANCE_BATCH_MAX = 1000
+
+def tap_date(record):
+    # Readers send either an explicit date or the tap timestamp (ISO 8601 or epoch seconds)
+    if record.get('date'):
+        return parse_date(record['date'])
+    timestamp = record.get('timestamp')
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp).date()
+    if timestamp:
+        return datetime.fromisoformat(timestamp).date()
+    return datetime.now().date()
+
+@api.route('/api/attendance/batch', methods=['POST'])
 @jwt_required()
-def get_attendance_records():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
+def mark_attendance_batch():
+    data = request.get_json()
+    records = data.get('records') if isinstance(data, dict) else data
+    if not isinstance(records, list) or not records:
+        return jsonify({'success': False, 'message': 'records must be a non-empty list'}), 400
+    if len(records) > ATTENDANCE_BATCH_MAX:
+        return jsonify({'success': False, 'message': f'At most {ATTENDANCE_BATCH_MAX} records per batch'}), 400
+
+    # Validate every tap against the index first, then write all accepted taps
+    # as one multi-row upsert keyed on uq_attendance_allocation. Taps replayed
+    # from an earlier batch are reported as already marked, and the unique key
+    # keeps a retry from creating duplicates even across workers.
+    results = []
+    claims = []
+    rows = []
+    for index, record in enumerate(records):
+        result = {'index': index, 'allocation_id': None, 'success': False}
+        results.append(result)
+        try:
+            rfid_tag = str(record['rfid_tag'])
+            allocation_id = int(record['allocation_id'])
+            date = tap_date(record)
+        except (KeyError, TypeError, ValueError):
+            result.update(status='invalid', message='rfid_tag, allocation_id and a valid date or timestamp are required')
+            continue
+        result['allocation_id'] = allocation_id
+
+        if not RFID_PATTERN.match(rfid_tag):
+            result.update(status='invalid', message='RFID must be a 10-digit number')
+            continue
+        faculty_id = rfid_index.faculty_for_tag(rfid_tag)
+        if faculty_id is None:
+            result.update(status='unknown_tag', message='Faculty not found with this RFID')
+            continue
+        allocation = rfid_index.get_allocation(date, allocation_id)
+        if not allocation or allocation.faculty_id != faculty_id:
+            result.update(status='invalid_allocation', message='Invalid allocation for this faculty or date')
+            continue
+        previous = rfid_index.claim(date, allocation_id)
+        if previous is PRESENT:
+            result.update(status='already_marked', message='Attendance already marked for this allocation')
+            continue
+
+        claims.append((date, allocation_id, previous, allocation))
+        rows.append({'faculty_id': faculty_id, 'allocation_id': allocation_id, 'date': date, 'is_present': True})
+        result.update(success=True, status='marked', message='Attendance marked successfully')
+
+    try:
+        # The index may be stale (another worker marked these taps); check the
+        # claimed allocations in one query so they are neither re-counted in
+        # the summary nor republished
+        if claims:
+            marked = {allocation_id for (allocation_id,) in db.session.query(Attendance.allocation_id).filter(
+                Attendance.allocation_id.in_([allocation_id for _, allocation_id, _, _ in claims]),
+                Attendance.is_present.is_(True))}
+            if marked:
+                for result in results:
+                    if result.get('status') == 'marked' and result['allocation_id'] in marked:
+                        result.update(success=False, status='already_marked',
+                                      message='Attendance already marked for this allocation')
+                claims = [claim for claim in claims if claim[1] not in marked]
+                rows = [row for row in rows if row['allocation_id'] not in marked]
+        upsert(Attendance, rows, ['is_present'], ['allocation_id'])
+        summary.record_present([allocation for _, _, _, allocation in claims])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for date, allocation_id, previous, _ in claims:
+            rfid_index.release(date, allocation_id, previous)
+        raise
+    response_cache.invalidate('attendance')
+    publish_present([allocation for _, _, _, allocation in claims])
+
+    return jsonify({
+        'success': True,
+        'marked': len(claims),
+        'rejected': len(records) - len(claims),
+        'results': results
+    })
+
+def feed_filters():
+    filters = {}
+    if request.args.get('date'):
+        filters['date'] = request.args['date']
+    if request.args.get('time_slot'):
+        filters['time_slot'] = request.args['time_slot']
+    if request.args.get('venue_id', type=int) is not None:
+        filters['venue_id'] = request.args.get('venue_id', type=int)
+    return filters
+
+def listeners_busy():
+    # Clients should retry after Retry-After, resuming from their cursor
+    response = jsonify({'message': 'Too many open attendance streams, retry shortly'})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+@api.route('/api/attendance/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_attendance():
+    # Server-sent events; EventSource can't set headers, so the token may be
+    # passed as ?jwt=. Resumes from Last-Event-ID or ?cursor= when given.
+    filters = feed_filters()
+    if not attendance_feed.join():
+        return listeners_busy()
+    cursor = request.headers.get('Last-Event-ID', type=int)
+    if cursor is None:
+        cursor = request.args.get('cursor', type=int)
+    if cursor is None:
+        cursor = attendance_feed.cursor
+    max_seconds = current_app.config['ATTENDANCE_STREAM_MAX_SECONDS']
+    keepalive = current_app.config['ATTENDANCE_STREAM_KEEPALIVE']
+
+    def generate():
+        nonlocal cursor
+        deadline = time.monotonic() + max_seconds
+        yield f'retry: 3000\n: connected at {cursor}\n\n'
+        while time.monotonic() < deadline:
+            events, latest, reset = attendance_feed.wait(cursor, filters, timeout=keepalive)
+            if reset:
+                yield f'id: {latest}\nevent: reset\ndata: {{}}\n\n'
+            for event in events:
+                yield sse_message(event)
+            if not events and not reset:
+                yield ': keepalive\n\n'
+            cursor = latest
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, even if the stream never started
+    response.call_on_close(attendance_feed.leave)
+    return response
 
+@api.route('/api/attendance/updates', methods=['GET'])
+@jwt_required()
+def poll_attendance():
+    # Long-poll alternative to the stream: returns as soon as a matching event
+    # arrives after ?cursor=, or after ?timeout= seconds with no events.
+    cursor = request.args.get('cursor', type=int)
+    if cursor is None:
+        return jsonify({'cursor': attendance_feed.cursor, 'events': [], 'reset': False})
+    timeout = min(max(request.args.get('timeout', 25, type=float), 0), 60)
+    if not attendance_feed.join():
+        return listeners_busy()
+    try:
+        events, latest, reset = attendance_feed.wait(cursor, feed_filters(), timeout=timeout)
+    finally:
+        attendance_feed.leave()
+    return jsonify({'cursor': latest, 'events': events, 'reset': reset})
+
+@api.route('/api/attendance/summary', methods=['GET'])
+@admin_required
+def get_attendance_summary():
+    try:
+        start_date, end_date = request_dates()
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    groups = request.args.get('groups', 'day,venue,slot,faculty').split(',')
+    return jsonify(summary.summarize(start_date, end_date, groups))
+
+@api.route('/api/attendance/preload', methods=['POST'])
+@admin_required
+def preload_attendance_index():
+    data = request.get_json(silent=True) or {}
+    date = datetime.strptime(data.get('date', datetime.now().strftime('%Y-%m-%d')), '%Y-%m-%d').date()
+    rfid_index.invalidate_dates([date])
+    count = rfid_index.preload(date)
+    return jsonify({'success': True, 'date': date.isoformat(), 'allocations': count})
+
+@api.route('/api/attendance/cache_stats', methods=['GET'])
+@admin_required
+def attendance_cache_stats():
+    return jsonify(rfid_index.stats())
+
+# Get Attendance Records (Admin only)
+@api.route('/api/attendance_records', methods=['GET'])
+@admin_required
+def get_attendance_records():
     date_filter = request.args.get('date', 'all')
     export_format = request.args.get('export', None)
+    try:
+        if date_filter != 'all':
+            parse_date(date_filter)
+        start_date, end_date = request_dates()
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+
+    # Archived terms are only read when the request reaches back into them:
+    # a date or range that includes archived days (an end_date without a
+    # start_date always does), or archive=1. date=all without a range stays
+    # on the current term.
+    if request.args.get('archive', type=int) == 1:
+        include_archive = archive.archived_through() is not None
+    elif date_filter != 'all':
+        day = parse_date(date_filter)
+        include_archive = archive.reaches_archive(day, day)
+    else:
+        include_archive = archive.reaches_archive(start_date, end_date)
 
-    query = Attendance.query.join(Faculty).join(VenueAllocation, isouter=True)
-    if date_filter != 'all':
-        query = query.filter(Attendance.date == date_filter)
-
-    records = query.all()
-    data = [{
-        'id': r.id,
-        'faculty_id': r.faculty_id,
-        'faculty_name': r.faculty.name,
-        'rfid_tag': r.faculty.rfid_tag,
-        'allocation_id': r.allocation_id,
-        'venue_name': r.allocation.venue.name if r.allocation else 'N/A',
-        'date': r.date.isoformat(),
-        'is_present': r.is_present
-    } for r in records]
-
+    query = exports.attendance_query(date_filter, start_date, end_date, include_archive)
     if export_format:
-        if export_format == 'excel':
-            import pandas as pd
-            df = pd.DataFrame(data)
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False)
-            output.seek(0)
-            return send_file(output, download_name=f'attendance_{date_filter}.xlsx', as_attachment=True)
-        elif export_format == 'pdf':
-            from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import SimpleDocTemplate, Table as RLTable
-            output = BytesIO()
-            doc = SimpleDocTemplate(output, pagesize=letter)
-            elements = []
-            table_data = [['ID', 'Faculty', 'RFID', 'Venue', 'Date', 'Present']] + [
-                [r['id'], r['faculty_name'], r['rfid_tag'], r['venue_name'], r['date'], 'Yes' if r['is_present'] else 'No']
-                for r in data
-            ]
-            table = RLTable(table_data)
-            elements.append(table)
-            doc.build(elements)
-            output.seek(0)
-            return send_file(output, download_name=f'attendance_{date_filter}.pdf', as_attachment=True)
-
-    return jsonify(data)
-
-@app.route('/api/venues', methods=['GET'])
+        if export_format not in exports.EXPORTERS:
+            return jsonify({'message': f'Unsupported export format: {export_format}'}), 400
+        exporter, extension = exports.EXPORTERS[export_format]
+        if start_date or end_date:
+            label = f"{start_date or 'start'}_to_{end_date or 'end'}"
+        else:
+            label = date_filter
+        return metrics.track_export(exporter(query, f'attendance_{label}.{extension}'), extension)
+
+    return jsonify(exports.records_to_dicts(query))
+
+# Attendance analytics (Admin only)
+@api.route('/api/analytics/faculty', methods=['GET'])
+@admin_required
+def faculty_analytics():
+    # Chronic absentees: at least min_duties allocations, absence_rate >= threshold
+    try:
+        start_date, end_date = request_dates()
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    threshold = request.args.get('threshold', 0.2, type=float)
+    min_duties = request.args.get('min_duties', 3, type=int)
+    report = analytics.report(start_date, end_date)
+    return jsonify({
+        'start_date': report['start_date'],
+        'end_date': report['end_date'],
+        'absence_rate': report['absence_rate'],
+        'threshold': threshold,
+        'min_duties': min_duties,
+        'chronic_absentees': [row for row in report['by_faculty']
+                              if row['allocated'] >= min_duties and row['absence_rate'] >= threshold],
+        'faculty': report['by_faculty']
+    })
+
+@api.route('/api/analytics/fairness', methods=['GET'])
+@admin_required
+def fairness_analytics():
+    try:
+        start_date, end_date = request_dates()
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    report = analytics.report(start_date, end_date)
+    return jsonify({'start_date': report['start_date'], 'end_date': report['end_date'], **report['fairness']})
+
+@api.route('/api/analytics/venues', methods=['GET'])
+@admin_required
+def venue_analytics():
+    try:
+        start_date, end_date = request_dates()
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    report = analytics.report(start_date, end_date)
+    return jsonify({'start_date': report['start_date'], 'end_date': report['end_date'], 'venues': report['by_venue']})
+
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    # Scrapers authenticate with METRICS_TOKEN; admins can use their login token
+    token = current_app.config.get('METRICS_TOKEN')
+    if not (token and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode())):
+        verify_jwt_in_request()
+        if not current_is_admin():
+            return jsonify({'message': 'Unauthorized'}), 403
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/venues', methods=['GET'])
 @jwt_required()
 def get_venues():
-    venues = Venue.query.all()
-    return jsonify([{
-        'venue_id': v.venue_id,
-        'name': v.name,
-        'location': v.location,
-        'capacity': v.capacity
-    } for v in venues])
-
-@app.route('/api/venues', methods=['POST'])
-@jwt_required()
+    # ?q=, fields=, sort=, limit=/cursor= and format=compact; see directory.py
+    try:
+        build = directory.VENUE_DIRECTORY.builder(request.args)
+    except DirectoryError as e:
+        return jsonify({'message': str(e)}), 400
+    return response_cache.json_response(['venues'], 'venues', build, with_headers=True)
+
+@api.route('/api/venues', methods=['POST'])
+@admin_required
 def add_venue():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
     data = request.get_json()
     venue = Venue(name=data['name'], location=data['location'], capacity=data['capacity'])
     db.session.add(venue)
     db.session.commit()
+    response_cache.invalidate('venues')
     return jsonify({'success': True, 'venue_id': venue.venue_id})
 
-@app.route('/api/venues/<int:venue_id>', methods=['DELETE'])
-@jwt_required()
+@api.route('/api/venues/<int:venue_id>', methods=['DELETE'])
+@admin_required
 def delete_venue(venue_id):
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
     venue = Venue.query.get_or_404(venue_id)
     db.session.delete(venue)
     db.session.commit()
+    response_cache.invalidate('venues')
     return jsonify({'success': True})
 
 # Faculty Management (Merged Single Definition)
-@app.route('/api/faculty', methods=['GET'])
-@jwt_required()
+@api.route('/api/faculty', methods=['GET'])
+@admin_required
 def get_faculty():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
-
-    faculty_list = Faculty.query.all()
-    return jsonify([{
-        'faculty_id': f.faculty_id,
-        'name': f.name,
-        'mobile_number': f.mobile_number,
-        'email_id': f.email_id,
-        'rfid_tag': f.rfid_tag,
-        'is_admin': f.is_admin
-    } for f in faculty_list])
-
-@app.route('/api/faculty', methods=['POST'])
-@jwt_required()
+    # ?q=, fields=, sort=, limit=/cursor= and format=compact; see directory.py
+    try:
+        build = directory.FACULTY_DIRECTORY.builder(request.args)
+    except DirectoryError as e:
+        return jsonify({'message': str(e)}), 400
+    return response_cache.json_response(['faculty'], 'faculty', build, with_headers=True)
+
+@api.route('/api/faculty', methods=['POST'])
+@admin_required
 def add_faculty():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
     data = request.get_json()
     faculty = Faculty(
         name=data['name'],
@@ -280,215 +612,338 @@ def add_faculty():
     )
     db.session.add(faculty)
     db.session.commit()
+    faculty_changed()
     return jsonify({'success': True, 'faculty_id': faculty.faculty_id})
 
-@app.route('/api/faculty/<int:faculty_id>', methods=['DELETE'])
-@jwt_required()
+@api.route('/api/faculty/<int:faculty_id>', methods=['DELETE'])
+@admin_required
 def delete_faculty(faculty_id):
-    faculty_id_auth = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id_auth)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
     faculty_to_delete = Faculty.query.get_or_404(faculty_id)
+    FacultyUnavailability.query.filter_by(faculty_id=faculty_id).delete(synchronize_session=False)
     db.session.delete(faculty_to_delete)
     db.session.commit()
+    faculty_changed()
+    availability_index.invalidate()
+    return jsonify({'success': True})
+
+# Faculty Unavailability (leave, teaching clashes)
+def unavailability_to_dict(entry):
+    return {
+        'id': entry.id,
+        'faculty_id': entry.faculty_id,
+        'start_date': entry.start_date.isoformat(),
+        'end_date': entry.end_date.isoformat(),
+        'time_slot': entry.time_slot,
+        'reason': entry.reason
+    }
+
+@api.route('/api/unavailability', methods=['GET'])
+@admin_required
+def get_unavailability():
+    try:
+        start_date, end_date = request_dates()
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    query = FacultyUnavailability.query
+    if start_date:
+        query = query.filter(FacultyUnavailability.end_date >= start_date)
+    if end_date:
+        query = query.filter(FacultyUnavailability.start_date <= end_date)
+    faculty_id = request.args.get('faculty_id', type=int)
+    if faculty_id:
+        query = query.filter(FacultyUnavailability.faculty_id == faculty_id)
+    entries = query.order_by(FacultyUnavailability.start_date, FacultyUnavailability.faculty_id).all()
+    return jsonify([unavailability_to_dict(entry) for entry in entries])
+
+@api.route('/api/unavailability', methods=['POST'])
+@admin_required
+def add_unavailability():
+    data = request.get_json()
+    try:
+        start_date = parse_date(data['start_date'])
+        end_date = parse_date(data.get('end_date') or data['start_date'])
+        faculty_id = int(data['faculty_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'message': 'faculty_id and start_date (YYYY-MM-DD) are required'}), 400
+    time_slot = data.get('time_slot') or None
+    if end_date < start_date:
+        return jsonify({'message': 'end_date must not be before start_date'}), 400
+    if time_slot is not None and time_slot not in TIME_SLOTS:
+        return jsonify({'message': f'Invalid time slot: {time_slot}'}), 400
+    if not db.session.get(Faculty, faculty_id):
+        return jsonify({'message': 'Faculty not found'}), 404
+
+    entry = FacultyUnavailability(faculty_id=faculty_id, start_date=start_date, end_date=end_date,
+                                  time_slot=time_slot, reason=data.get('reason'))
+    db.session.add(entry)
+    db.session.commit()
+    availability_index.invalidate()
+    return jsonify({'success': True, **unavailability_to_dict(entry)})
+
+@api.route('/api/unavailability/<int:entry_id>', methods=['DELETE'])
+@admin_required
+def delete_unavailability(entry_id):
+    entry = FacultyUnavailability.query.get_or_404(entry_id)
+    db.session.delete(entry)
+    db.session.commit()
+    availability_index.invalidate()
     return jsonify({'success': True})
 
 # Venue Allocation
-@app.route('/api/allocations', methods=['GET'])
-@jwt_required()
-def get_allocations():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    db.session.expire_all()
+ALLOCATIONS_PAGE_MAX = 1000
+MAX_GENERATE_DAYS = 366
 
-    if faculty.is_admin:
-        allocations = VenueAllocation.query.join(Faculty).join(Venue).all()
-    else:
-        allocations = VenueAllocation.query.join(Faculty).join(Venue).filter(VenueAllocation.faculty_id == faculty_id).all()
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
 
-    return jsonify([{
-        'allocation_id': a.allocation_id,
-        'faculty_id': a.faculty_id,
-        'faculty_name': a.faculty.name,
-        'venue_id': a.venue_id,
-        'venue_name': a.venue.name,
-        'venue_location': a.venue.location,
-        'date': a.date.isoformat(),
-        'time_slot': a.time_slot,
-        'is_present': bool(Attendance.query.filter_by(allocation_id=a.allocation_id, is_present=True).first())
-    } for a in allocations])
+def request_dates(fallback=None):
+    # ?start_date= and ?end_date= as dates, None when absent; a missing end
+    # falls back to ?<fallback>= (e.g. 'date') when given. Raises ValueError.
+    def arg(name):
+        value = request.args.get(name) or (request.args.get(fallback) if fallback else None)
+        return parse_date(value) if value else None
+    return arg('start_date'), arg('end_date')
 
-@app.route('/api/allocations/generate', methods=['POST'])
+@api.route('/api/allocations', methods=['GET'])
 @jwt_required()
+def get_allocations():
+    try:
+        start_date, end_date = request_dates(fallback='date')
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    venue_id = request.args.get('venue_id', type=int)
+    time_slot = request.args.get('time_slot')
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+
+    query = db.session.query(
+        VenueAllocation.allocation_id,
+        VenueAllocation.faculty_id,
+        Faculty.name,
+        VenueAllocation.venue_id,
+        Venue.name,
+        Venue.location,
+        VenueAllocation.date,
+        VenueAllocation.time_slot,
+        Attendance.id.isnot(None)
+    ).join(Faculty, Faculty.faculty_id == VenueAllocation.faculty_id) \
+        .join(Venue, Venue.venue_id == VenueAllocation.venue_id) \
+        .outerjoin(Attendance, summary.present_join())
+
+    if not current_is_admin():
+        query = query.filter(VenueAllocation.faculty_id == current_faculty_id())
+    if start_date:
+        query = query.filter(VenueAllocation.date >= start_date)
+    if end_date:
+        query = query.filter(VenueAllocation.date <= end_date)
+    if venue_id is not None:
+        query = query.filter(VenueAllocation.venue_id == venue_id)
+    if time_slot:
+        query = query.filter(VenueAllocation.time_slot == time_slot)
+
+    # attendance is unique per allocation (uq_attendance_allocation), so the
+    # outer join adds no rows and only touches the page's allocations.
+    # Keyset pagination on allocation_id: pass the X-Next-Cursor header back as ?after=
+    query = query.order_by(VenueAllocation.allocation_id)
+    if after is not None:
+        query = query.filter(VenueAllocation.allocation_id > after)
+    if limit is not None:
+        limit = max(1, min(limit, ALLOCATIONS_PAGE_MAX))
+        query = query.limit(limit)
+
+    rows = query.all()
+    response = jsonify([{
+        'allocation_id': allocation_id,
+        'faculty_id': alloc_faculty_id,
+        'faculty_name': faculty_name,
+        'venue_id': alloc_venue_id,
+        'venue_name': venue_name,
+        'venue_location': venue_location,
+        'date': alloc_date.isoformat(),
+        'time_slot': alloc_time_slot,
+        'is_present': bool(is_present)
+    } for (allocation_id, alloc_faculty_id, faculty_name, alloc_venue_id, venue_name,
+           venue_location, alloc_date, alloc_time_slot, is_present) in rows])
+    if limit is not None and len(rows) == limit:
+        response.headers['X-Next-Cursor'] = str(rows[-1][0])
+    return response
+
+def parse_generate_request(data):
+    # Accepts either a single date/time_slot (the original form) or a
+    # start_date/end_date range with a list of time_slots.
+    start_date = parse_date(data.get('start_date', data.get('date')))
+    end_date = parse_date(data.get('end_date', data.get('date', data.get('start_date'))))
+    if end_date < start_date:
+        raise AllocationError('end_date must not be before start_date')
+    if (end_date - start_date).days >= MAX_GENERATE_DAYS:
+        raise AllocationError(f'Date range must be at most {MAX_GENERATE_DAYS} days')
+    if archive.is_archived(start_date):
+        raise AllocationError(f'{start_date.isoformat()} is in an archived term')
+    time_slots = data.get('time_slots') or [data['time_slot']]
+    for time_slot in time_slots:
+        if time_slot not in TIME_SLOTS:
+            raise AllocationError(f'Invalid time slot: {time_slot}')
+    slots = [(date, time_slot) for date in date_range(start_date, end_date) for time_slot in time_slots]
+    options = {
+        'strategy': data.get('strategy', 'greedy'),
+        'scale_by_capacity': bool(data.get('scale_by_capacity', False)),
+        'max_per_day': int(data['max_per_day']) if data.get('max_per_day') else current_app.config.get('ALLOCATION_MAX_PER_DAY'),
+        'seed': data.get('seed')
+    }
+    return slots, int(data['faculty_per_venue']), options
+
+@api.route('/api/allocations/generate', methods=['POST'])
+@admin_required
 def generate_allocations():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
     data = request.get_json()
-    date = datetime.strptime(data['date'], '%Y-%m-%d').date()
-    time_slot = data['time_slot']
-    faculty_per_venue = int(data['faculty_per_venue'])
-
-    venues = Venue.query.all()
-    faculty_list = Faculty.query.filter_by(is_admin=False).all()
-
-    required = len(venues) * faculty_per_venue
-    available = len(faculty_list)
-    if available < required:
-        return jsonify({
-            'message': f'Not enough faculty available: {required} needed, but only {available} available'
-        }), 400
-
-    VenueAllocation.query.filter_by(date=date, time_slot=time_slot).delete()
-    random.shuffle(faculty_list)
-    allocations = []
-    faculty_index = 0
-    for venue in venues:
-        for _ in range(min(faculty_per_venue, len(faculty_list) - faculty_index)):
-            allocation = VenueAllocation(
-                faculty_id=faculty_list[faculty_index].faculty_id,
-                venue_id=venue.venue_id,
-                date=date,
-                time_slot=time_slot
-            )
-            allocations.append(allocation)
-            faculty_index += 1
-        if faculty_index >= len(faculty_list):
-            break
-
-    db.session.bulk_save_objects(allocations)
+    # mode=replace (default) rebuilds the slots from scratch; mode=incremental
+    # keeps valid allocations and their attendance and changes only the rest.
+    mode = data.get('mode', 'replace') if isinstance(data, dict) else 'replace'
+    if mode not in ('replace', 'incremental'):
+        return jsonify({'message': f'Unknown mode: {mode}'}), 400
+    try:
+        slots, faculty_per_venue, options = parse_generate_request(data)
+        if mode == 'incremental':
+            changes = allocation_engine.diff_allocations(slots, faculty_per_venue, **options)
+        else:
+            rows = allocation_engine.generate(slots, faculty_per_venue, **options)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'message': 'date, time_slot and faculty_per_venue are required'}), 400
+    except AllocationError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if mode == 'incremental':
+        report = allocation_engine.apply_changes(slots, changes)
+        db.session.commit()
+        if report['rows_changed']:
+            rfid_index.invalidate_dates({date for date, _ in slots})
+            response_cache.invalidate('attendance')
+        return jsonify({'success': True, 'message': 'Allocations updated successfully',
+                        'count': report['unchanged'] + report['updated'] + report['inserted'], **report})
+
+    allocation_engine.replace_allocations(slots, rows)
     db.session.commit()
-    return jsonify({'success': True, 'message': 'Allocations generated successfully'})
+    rfid_index.invalidate_dates({date for date, _ in slots})
+    response_cache.invalidate('attendance')
+    return jsonify({'success': True, 'message': 'Allocations generated successfully', 'count': len(rows)})
 
-@app.route('/api/bulk-import/faculty', methods=['POST'])
-@jwt_required()
-def bulk_import_faculty():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
+@api.route('/api/allocations/jobs', methods=['POST'])
+@admin_required
+def create_allocation_job():
+    data = request.get_json()
+    try:
+        slots, faculty_per_venue, options = parse_generate_request(data)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'message': 'start_date, end_date, time_slots and faculty_per_venue are required'}), 400
+    except AllocationError as e:
+        return jsonify({'message': str(e)}), 400
+    if data.get('mode', 'replace') != 'replace':
+        return jsonify({'message': 'Incremental mode is only available on /api/allocations/generate'}), 400
+
+    days = len({date for date, _ in slots})
+    job = jobs.submit('generate_allocations', days, allocation_engine.run_generation_job, slots, faculty_per_venue, options)
+    return jsonify({'success': True, 'job_id': job.id, 'status': job.status}), 202
+
+@api.route('/api/allocations/jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_allocation_job(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({'message': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@api.route('/api/allocations/validate', methods=['GET'])
+@admin_required
+def validate_allocations():
+    # Check existing allocations against faculty unavailability and the
+    # per-day duty limit, using the in-memory availability index
+    try:
+        start_date, end_date = request_dates(fallback='date')
+    except ValueError:
+        return jsonify({'message': 'Dates must be in YYYY-MM-DD format'}), 400
+    if not start_date:
+        return jsonify({'message': 'date or start_date/end_date is required'}), 400
+    end_date = end_date or start_date
+    if (end_date - start_date).days >= MAX_GENERATE_DAYS:
+        return jsonify({'message': f'Date range must be at most {MAX_GENERATE_DAYS} days'}), 400
+    max_per_day = request.args.get('max_per_day', current_app.config.get('ALLOCATION_MAX_PER_DAY'), type=int)
+
+    query = db.session.query(
+        VenueAllocation.allocation_id,
+        VenueAllocation.faculty_id,
+        VenueAllocation.venue_id,
+        VenueAllocation.date,
+        VenueAllocation.time_slot
+    ).filter(VenueAllocation.date.between(start_date, end_date))
+    faculty_id = request.args.get('faculty_id', type=int)
+    if faculty_id:
+        query = query.filter(VenueAllocation.faculty_id == faculty_id)
+
+    rows = query.all()
+    unavailable = []
+    duties = {}
+    for allocation_id, alloc_faculty_id, venue_id, date, time_slot in rows:
+        if not availability_index.is_available(alloc_faculty_id, date, time_slot):
+            unavailable.append({'allocation_id': allocation_id, 'faculty_id': alloc_faculty_id, 'venue_id': venue_id,
+                                'date': date.isoformat(), 'time_slot': time_slot})
+        duties[(alloc_faculty_id, date)] = duties.get((alloc_faculty_id, date), 0) + 1
+    over_limit = [{'faculty_id': f, 'date': date.isoformat(), 'duties': count}
+                  for (f, date), count in sorted(duties.items()) if max_per_day and count > max_per_day]
+    return jsonify({
+        'checked': len(rows),
+        'valid': not unavailable and not over_limit,
+        'unavailable': unavailable,
+        'over_limit': over_limit
+    })
 
+def run_bulk_import(spec, label):
     if 'file' not in request.files:
         return jsonify({'message': 'No file part in the request'}), 400
 
-    file = request.files['file']
-    if not file.filename.endswith('.xlsx'):
-        return jsonify({'message': 'Please upload an XLSX file'}), 400
-
     try:
-        workbook = openpyxl.load_workbook(BytesIO(file.read()))
-        sheet = workbook.active
-
-        expected_headers = ['faculty_id', 'name', 'mobile_number', 'email_id', 'is_admin', 'rfid_tag']
-        headers = [cell.value.lower() if cell.value else '' for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-
-        if not all(h in headers for h in expected_headers):
-            return jsonify({'message': 'Invalid Excel format. Required columns: faculty_id, name, mobile_number, email_id, is_admin, rfid_tag'}), 400
-
-        imported_count = 0
-        updated_count = 0
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if len(row) < 6:
-                continue
-
-            faculty_id, name, mobile_number, email_id, is_admin, rfid_tag = row
-            existing_faculty = db.session.get(Faculty, faculty_id) if faculty_id else None
-
-            if existing_faculty:
-                existing_faculty.name = name
-                existing_faculty.mobile_number = str(mobile_number)
-                existing_faculty.email_id = email_id
-                existing_faculty.is_admin = bool(is_admin)
-                existing_faculty.rfid_tag = rfid_tag
-                updated_count += 1
-            else:
-                new_faculty = Faculty(
-                    faculty_id=faculty_id,
-                    name=name,
-                    mobile_number=str(mobile_number),
-                    email_id=email_id,
-                    is_admin=bool(is_admin),
-                    rfid_tag=rfid_tag
-                )
-                db.session.add(new_faculty)
-                imported_count += 1
-
+        report = importer.import_file(spec, request.files['file'])
         db.session.commit()
-        db.session.expire_all()
-        return jsonify({
-            'success': True,
-            'message': f'Successfully imported {imported_count} new faculty and updated {updated_count} existing faculty'
-        })
-
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error during faculty bulk import: {str(e)}")
+        logger.error(f"Error during {label} bulk import: {str(e)}")
         return jsonify({'message': f'Error processing file: {str(e)}'}), 500
 
-@app.route('/api/bulk-import/venues', methods=['POST'])
-@jwt_required()
-def bulk_import_venues():
-    faculty_id = get_jwt_identity()
-    faculty = db.session.get(Faculty, faculty_id)
-    if not faculty or not faculty.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
+    message = f"Successfully imported {report['inserted']} new {label} and updated {report['updated']} existing {label}"
+    if report['rejected']:
+        message += f", rejected {report['rejected']} rows"
+    return jsonify({'success': True, 'message': message, **report})
 
-    if 'file' not in request.files:
-        return jsonify({'message': 'No file part in the request'}), 400
-
-    file = request.files['file']
-    if not file.filename.endswith('.xlsx'):
-        return jsonify({'message': 'Please upload an XLSX file'}), 400
-
-    try:
-        workbook = openpyxl.load_workbook(BytesIO(file.read()))
-        sheet = workbook.active
-
-        expected_headers = ['venue_id', 'name', 'location', 'capacity']
-        headers = [cell.value.lower() if cell.value else '' for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-
-        if not all(h in headers for h in expected_headers):
-            return jsonify({'message': 'Invalid Excel format. Required columns: venue_id, name, location, capacity'}), 400
-
-        imported_count = 0
-        updated_count = 0
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if len(row) < 4:
-                continue
-
-            venue_id = row[0]
-            existing_venue = Venue.query.get(venue_id) if venue_id else None
-
-            if existing_venue:
-                existing_venue.name = row[1]
-                existing_venue.location = row[2]
-                existing_venue.capacity = int(row[3])
-                updated_count += 1
-            else:
-                new_venue = Venue(
-                    venue_id=venue_id,
-                    name=row[1],
-                    location=row[2],
-                    capacity=int(row[3])
-                )
-                db.session.add(new_venue)
-                imported_count += 1
+@api.route('/api/bulk-import/faculty', methods=['POST'])
+@admin_required
+def bulk_import_faculty():
+    response = run_bulk_import(importer.FACULTY_IMPORT, 'faculty')
+    faculty_changed()
+    return response
 
-        db.session.commit()
-        db.session.expire_all()
-        return jsonify({
-            'success': True,
-            'message': f'Successfully imported {imported_count} new venues and updated {updated_count} existing venues'
-        })
+@api.route('/api/bulk-import/venues', methods=['POST'])
+@admin_required
+def bulk_import_venues():
+    response = run_bulk_import(importer.VENUE_IMPORT, 'venues')
+    response_cache.invalidate('venues')
+    return response
 
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error during venue bulk import: {str(e)}")
-        return jsonify({'message': f'Error processing file: {str(e)}'}), 500
+@api.route('/api/bulk-import/unavailability', methods=['POST'])
+@admin_required
+def bulk_import_unavailability():
+    response = run_bulk_import(importer.UNAVAILABILITY_IMPORT, 'unavailability entries')
+    availability_index.invalidate()
+    return response
 
 if __name__ == '__main__':
+    import sys
+    if '--profile-startup' in sys.argv:
+        print('\n'.join(startup.profile_startup()))
+        sys.exit()
+    app = create_app()
+    # Local development server: create missing tables for convenience
+    with app.app_context():
+        db.create_all()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
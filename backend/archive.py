@@ -0,0 +1,78 @@
+# backend/archive.py
+# Moves closed terms out of the hot tables. Allocations dated before a cutoff
+# are copied, together with their attendance, into venue_allocations_archive
+# and attendance_archive and deleted from the hot tables in batches, one
+# transaction per batch. Hot queries (check-in, listings, generation) only
+# ever see the current term; attendance records and exports union in the
+# archive when a requested date range reaches into it.
+#
+#   flask --app app archive --before 2026-01-01
+from sqlalchemy import delete, func, insert, select
+
+from model import db, Attendance, AttendanceArchive, VenueAllocation, VenueAllocationArchive
+
+BATCH_SIZE = 5000
+
+ATTENDANCE_COLUMNS = ['id', 'faculty_id', 'allocation_id', 'date', 'is_present']
+ALLOCATION_COLUMNS = ['allocation_id', 'faculty_id', 'venue_id', 'date', 'time_slot']
+
+
+def archived_through():
+    """Return the last archived date, or None when nothing has been archived."""
+    return db.session.query(func.max(VenueAllocationArchive.date)).scalar()
+
+
+def is_archived(date):
+    last = archived_through()
+    return last is not None and date <= last
+
+
+def reaches_archive(start_date, end_date):
+    """True when start_date..end_date (open where None) includes archived days.
+
+    A range with neither end is treated as the current term only.
+    """
+    if start_date is None and end_date is None:
+        return False
+    last = archived_through()
+    return last is not None and (start_date is None or start_date <= last)
+
+
+def move(source, target, columns, key, ids):
+    db.session.execute(insert(target).from_select(columns, select(*[getattr(source, c) for c in columns]).where(key.in_(ids))))
+    db.session.execute(delete(source).where(key.in_(ids)))
+
+
+def archive_before(cutoff, batch_size=BATCH_SIZE, progress=None):
+    """Archive allocations dated before cutoff and their attendance. Commits per batch.
+
+    Returns {'attendance': n, 'allocations': n}.
+    """
+    moved = {'attendance': 0, 'allocations': 0}
+    # Attendance goes first; it references the allocations
+    while True:
+        ids = [row_id for (row_id,) in db.session.query(Attendance.id)
+               .join(VenueAllocation, VenueAllocation.allocation_id == Attendance.allocation_id)
+               .filter(VenueAllocation.date < cutoff)
+               .order_by(Attendance.id)
+               .limit(batch_size)]
+        if not ids:
+            break
+        move(Attendance, AttendanceArchive, ATTENDANCE_COLUMNS, Attendance.id, ids)
+        db.session.commit()
+        moved['attendance'] += len(ids)
+        if progress:
+            progress('attendance', moved['attendance'])
+    while True:
+        ids = [allocation_id for (allocation_id,) in db.session.query(VenueAllocation.allocation_id)
+               .filter(VenueAllocation.date < cutoff)
+               .order_by(VenueAllocation.allocation_id)
+               .limit(batch_size)]
+        if not ids:
+            break
+        move(VenueAllocation, VenueAllocationArchive, ALLOCATION_COLUMNS, VenueAllocation.allocation_id, ids)
+        db.session.commit()
+        moved['allocations'] += len(ids)
+        if progress:
+            progress('allocations', moved['allocations'])
+    return moved
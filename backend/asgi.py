@@ -0,0 +1,68 @@
+# backend/asgi.py
+# Optional ASGI entry point for servers such as uvicorn:
+#   uvicorn asgi:app --workers 1 --port 5000
+# asgiref's WsgiToAsgi runs every request on one shared thread
+# (thread-sensitive sync_to_async), so a single open stream would stall the
+# server. Requests run on a dedicated pool of ASGI_THREADS threads instead;
+# each open attendance stream or long-poll holds one of them, so
+# ATTENDANCE_MAX_LISTENERS defaults to half the pool. Requires the asgiref
+# package.
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 32))
+os.environ.setdefault('ATTENDANCE_MAX_LISTENERS', str(max(ASGI_THREADS // 2, 1)))
+
+from app import create_app  # after the default above; Config reads it on import
+
+executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi')
+
+
+class PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self.serve, thread_sensitive=False, executor=executor)(body)
+
+    def serve(self, body):
+        # WsgiToAsgiInstance.run_wsgi_app, run on the pool. It also closes the
+        # response iterable, which asgiref does not: streams release their
+        # listener slot in the close callback.
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            # Too many duplicate headers
+            self.sync_send({'type': 'http.response.start', 'status': 400,
+                            'headers': [(b'content-type', b'text/plain')]})
+            self.sync_send({'type': 'http.response.body', 'body': b'Bad Request: Too many duplicate headers'})
+            return
+        iterable = self.wsgi_application(environ, self.start_response)
+        try:
+            bytes_sent = 0
+            for output in iterable:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                # Never send more than the declared Content-Length
+                if self.response_content_length is not None:
+                    output = output[:self.response_content_length - bytes_sent]
+                self.sync_send({'type': 'http.response.body', 'body': output, 'more_body': True})
+                bytes_sent += len(output)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await PooledWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+app = PooledWsgiToAsgi(create_app())
@@ -0,0 +1,133 @@
+# backend/auth.py
+# Token authorization without a Faculty fetch per request. Tokens carry an
+# is_admin claim set at login; admin_required trusts it only while the
+# faculty member is still in the cached set of admin ids, which is reloaded
+# at most every AUTH_ROLE_CACHE_TTL seconds and dropped on every faculty
+# write, so demotions and deletions apply quickly. Logged-out tokens are
+# stored in revoked_tokens until they expire; each process keeps the
+# unexpired set in memory and reloads it at most every AUTH_BLOCKLIST_TTL
+# seconds, so a logout applies at once in the worker that handled it and
+# within that interval everywhere else.
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import or_
+
+from model import db, Faculty, RevokedToken
+
+
+class RoleCache:
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._admin_ids = None
+        self._loaded_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AUTH_ROLE_CACHE_TTL', self.ttl)
+
+    def admin_ids(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._admin_ids is not None and now - self._loaded_at < self.ttl:
+                return self._admin_ids
+            generation = self._generation
+        admin_ids = frozenset(f for (f,) in db.session.query(Faculty.faculty_id).filter(Faculty.is_admin.is_(True)).all())
+        with self._lock:
+            if generation == self._generation:
+                self._admin_ids = admin_ids
+                self._loaded_at = now
+        return admin_ids
+
+    def invalidate(self):
+        with self._lock:
+            self._admin_ids = None
+            self._generation += 1
+
+
+role_cache = RoleCache()
+
+
+def issue_token(faculty):
+    return create_access_token(identity=str(faculty.faculty_id), additional_claims={'is_admin': bool(faculty.is_admin)})
+
+
+def current_faculty_id():
+    return int(get_jwt_identity())
+
+
+def current_is_admin():
+    # Tokens issued before role claims existed fall back to the admin set alone
+    return bool(get_jwt().get('is_admin', True)) and current_faculty_id() in role_cache.admin_ids()
+
+
+def admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        if not current_is_admin():
+            return jsonify({'message': 'Unauthorized'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+class TokenBlocklist:
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._revoked = None  # jti -> exp (None: never expires)
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AUTH_BLOCKLIST_TTL', self.ttl)
+
+    def revoke(self, jti, exp=None):
+        """Store a revoked token and drop expired ones. Does not commit."""
+        db.session.query(RevokedToken).filter(RevokedToken.expires_at < int(time.time())) \
+            .delete(synchronize_session=False)
+        db.session.merge(RevokedToken(jti=jti, expires_at=exp))
+        with self._lock:
+            if self._revoked is not None:
+                self._revoked[jti] = exp
+
+    def is_revoked(self, jti):
+        revoked = self._load()
+        if jti not in revoked:
+            return False
+        return revoked[jti] is None or revoked[jti] > time.time()
+
+    def invalidate(self):
+        with self._lock:
+            self._revoked = None
+
+    def _load(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._revoked is not None and now - self._loaded_at < self.ttl:
+                return self._revoked
+            local = dict(self._revoked or {})
+        cutoff = int(time.time())
+        revoked = dict(db.session.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+            or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at > cutoff)).all())
+        # Revocations made here may not be visible to this query yet
+        revoked.update((jti, exp) for jti, exp in local.items() if exp is None or exp > cutoff)
+        with self._lock:
+            self._revoked = revoked
+            self._loaded_at = now
+        return revoked
+
+
+token_blocklist = TokenBlocklist()
+
+
+def revoke_current_token():
+    claims = get_jwt()
+    token_blocklist.revoke(claims['jti'], claims.get('exp'))
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    return token_blocklist.is_revoked(jwt_payload['jti'])
@@ -0,0 +1,101 @@
+# backend/availability.py
+# Process-local index of faculty unavailability. Each faculty member's
+# unavailable (date, time_slot) pairs are held as one integer bitset, with
+# bit (day - base) * len(TIME_SLOTS) + slot, so eligibility checks for a
+# whole term are bit tests instead of per-row queries.
+#
+# Writes through this app invalidate the index; AVAILABILITY_INDEX_TTL bounds
+# how long it can miss writes made by other worker processes.
+import threading
+import time
+
+from model import db, FacultyUnavailability, VenueAllocation
+
+TIME_SLOTS = tuple(VenueAllocation.time_slot.type.enums)
+SLOT_BITS = {time_slot: index for index, time_slot in enumerate(TIME_SLOTS)}
+DAY_MASK = (1 << len(TIME_SLOTS)) - 1
+
+
+class AvailabilityIndex:
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._masks = None
+        self._base = 0
+        self._loaded_at = 0
+        self._generation = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AVAILABILITY_INDEX_TTL', self.ttl)
+
+    # Lookups
+
+    def is_available(self, faculty_id, date, time_slot):
+        masks, base = self._load()
+        mask = masks.get(faculty_id)
+        return not mask or not self._test(mask, base, date, time_slot)
+
+    def unavailable(self, slots):
+        """Return {(date, time_slot): set of unavailable faculty ids} for slots."""
+        masks, base = self._load()
+        bits = {slot: self._bit(base, *slot) for slot in slots}
+        result = {slot: set() for slot in slots}
+        for faculty_id, mask in masks.items():
+            for slot, bit in bits.items():
+                if bit >= 0 and mask >> bit & 1:
+                    result[slot].add(faculty_id)
+        return result
+
+    def stats(self):
+        with self._lock:
+            masks = self._masks or {}
+            return {'loads': self.loads, 'faculty': len(masks), 'blocked_slots': sum(bin(m).count('1') for m in masks.values())}
+
+    def invalidate(self):
+        with self._lock:
+            self._masks = None
+            self._generation += 1
+
+    # Bitsets
+
+    @staticmethod
+    def _bit(base, date, time_slot):
+        return (date.toordinal() - base) * len(TIME_SLOTS) + SLOT_BITS[time_slot]
+
+    def _test(self, mask, base, date, time_slot):
+        bit = self._bit(base, date, time_slot)
+        return bit >= 0 and mask >> bit & 1
+
+    def _load(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._masks is not None and now - self._loaded_at < self.ttl:
+                return self._masks, self._base
+            generation = self._generation
+        rows = db.session.query(
+            FacultyUnavailability.faculty_id,
+            FacultyUnavailability.start_date,
+            FacultyUnavailability.end_date,
+            FacultyUnavailability.time_slot
+        ).all()
+        base = min((start_date.toordinal() for _, start_date, _, _ in rows), default=0)
+        masks = {}
+        for faculty_id, start_date, end_date, time_slot in rows:
+            days = end_date.toordinal() - start_date.toordinal() + 1
+            if days <= 0:
+                continue
+            # One run of ones per day (all slots) or every len(TIME_SLOTS)-th bit
+            per_day = DAY_MASK if time_slot is None else 1 << SLOT_BITS[time_slot]
+            run = int(f'{per_day:0{len(TIME_SLOTS)}b}' * days, 2)
+            masks[faculty_id] = masks.get(faculty_id, 0) | run << (start_date.toordinal() - base) * len(TIME_SLOTS)
+        with self._lock:
+            if generation == self._generation:
+                self._masks = masks
+                self._base = base
+                self._loaded_at = now
+            self.loads += 1
+        return masks, base
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,328 @@
+# backend/benchmark.py
+# Reproducible benchmark for the API. Seeds a database with synthetic
+# faculty, venues, allocations and attendance at a configurable scale, drives
+# the real app through the Flask test client (or a local HTTP server with
+# --http) and prints throughput and p50/p99 latency per scenario as JSON.
+#
+#   python benchmark.py --output before.json
+#   python benchmark.py --faculty 10000 --venues 250 --per-venue 4 --days 500 --output big.json
+#   python benchmark.py --compare before.json
+#
+# The default database is a fresh SQLite file in a temporary directory. With
+# --database (e.g. a local MySQL) every table in that database is dropped and
+# re-seeded, so never point it at real data.
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from config import Config
+from allocation import TIME_SLOTS
+from bulk import chunked
+from model import db, Faculty, Attendance, Venue, VenueAllocation
+import summary
+
+SEED_BATCH = 10000
+SCENARIOS = ['login', 'checkin', 'listing', 'generation', 'import', 'export_csv', 'export_xlsx', 'export_pdf']
+# Default iterations per scenario; heavy scenarios run fewer times
+ITERATIONS = {'login': 200, 'checkin': 200, 'listing': 200, 'generation': 10, 'import': 5,
+              'export_csv': 10, 'export_xlsx': 5, 'export_pdf': 5}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Seed a database and benchmark the API.')
+    parser.add_argument('--database', help='SQLAlchemy URL; all its tables are dropped and re-seeded')
+    parser.add_argument('--faculty', type=int, default=2000)
+    parser.add_argument('--venues', type=int, default=100)
+    parser.add_argument('--per-venue', type=int, default=5, help='faculty per venue in each seeded slot')
+    parser.add_argument('--days', type=int, default=30, help='days of seeded allocations before the benchmark day')
+    parser.add_argument('--present-rate', type=float, default=0.9, help='share of seeded allocations marked present')
+    parser.add_argument('--import-rows', type=int, default=1000, help='rows in the bulk import file')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated subset of ' + ','.join(SCENARIOS))
+    parser.add_argument('--iterations', type=int, help='iterations for every scenario (default: per scenario)')
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads per scenario')
+    parser.add_argument('--http', action='store_true', help='serve the app on a local port instead of the test client')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='previous JSON report to compare p50/p99 against')
+    return parser.parse_args(argv)
+
+
+# Clients: both return (status, body bytes) so scenarios don't care which is used
+
+class TestClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, payload=None, files=None, headers=None):
+        response = self.client.open(path, method=method, json=payload, data=files, headers=headers)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    def __init__(self, port):
+        import http.client
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+
+    def request(self, method, path, payload=None, files=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        elif files:
+            boundary = uuid.uuid4().hex
+            name, (content, filename) = next(iter(files.items()))
+            body = (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: application/octet-stream\r\n\r\n').encode('utf-8') \
+                + content.getvalue() + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+
+def serve(app):
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Seeding
+
+def faculty_row(faculty_id):
+    return {
+        'faculty_id': faculty_id,
+        'name': f'Faculty {faculty_id}',
+        'mobile_number': f'9{faculty_id:09d}',
+        'email_id': f'faculty{faculty_id}@bench.local',
+        'rfid_tag': f'{faculty_id:010d}',
+        'is_admin': faculty_id == 1
+    }
+
+
+def seed(args, today):
+    rng = random.Random(args.seed)
+    per_slot = min(args.faculty, args.venues * args.per_venue)
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(Faculty), [faculty_row(i) for i in range(1, args.faculty + 1)])
+    db.session.execute(insert(Venue), [{'venue_id': v, 'name': f'Venue {v}', 'location': f'Block {v % 10}',
+                                        'capacity': 30 + (v % 5) * 10} for v in range(1, args.venues + 1)])
+
+    # Each (day, slot) takes per_slot consecutive faculty, rotating through the
+    # whole faculty list; the benchmark day itself gets no attendance.
+    allocation_id = 0
+    allocations, attendance = [], []
+    for day in range(args.days, -1, -1):
+        allocation_date = today - timedelta(days=day)
+        for slot_index, time_slot in enumerate(TIME_SLOTS):
+            offset = (day * len(TIME_SLOTS) + slot_index) * per_slot
+            for position in range(per_slot):
+                allocation_id += 1
+                faculty_id = (offset + position) % args.faculty + 1
+                allocations.append({'allocation_id': allocation_id, 'faculty_id': faculty_id,
+                                    'venue_id': position // args.per_venue % args.venues + 1,
+                                    'date': allocation_date, 'time_slot': time_slot})
+                if day and rng.random() < args.present_rate:
+                    attendance.append({'faculty_id': faculty_id, 'allocation_id': allocation_id,
+                                       'date': allocation_date, 'is_present': True})
+    for batch in chunked(allocations, SEED_BATCH):
+        db.session.execute(insert(VenueAllocation), batch)
+    for batch in chunked(attendance, SEED_BATCH):
+        db.session.execute(insert(Attendance), batch)
+    summary.rebuild()
+    db.session.commit()
+    return {'faculty': args.faculty, 'venues': args.venues, 'allocations': len(allocations), 'attendance': len(attendance)}
+
+
+# Scenarios: each returns a function run once per iteration with the
+# iteration number and a client and return the client's (status, body).
+
+def build_scenarios(args, today, app):
+    admin = {'Authorization': f"Bearer {login_token(app, 1)}"}
+    with app.app_context():
+        open_allocations = db.session.query(VenueAllocation.allocation_id, VenueAllocation.faculty_id) \
+            .filter(VenueAllocation.date == today).order_by(VenueAllocation.allocation_id).all()
+    taps = iter(open_allocations)
+    taps_lock = threading.Lock()
+    rng = random.Random(args.seed)
+    export_date = (today - timedelta(days=1)).isoformat()
+
+    def login(i, client):
+        faculty_id = rng.randint(1, args.faculty)
+        return client.request('POST', '/api/login', payload={'email': f'faculty{faculty_id}@bench.local',
+                                                           'password': f'9{faculty_id:09d}'})
+
+    def checkin(i, client):
+        with taps_lock:
+            allocation_id, faculty_id = next(taps)
+        return client.request('POST', '/api/attendance', headers=admin, payload={
+            'date': today.isoformat(), 'allocation_id': allocation_id, 'rfid_tag': f'{faculty_id:010d}'})
+
+    def listing(i, client):
+        listing_date = today - timedelta(days=i % (args.days + 1))
+        return client.request('GET', f'/api/allocations?date={listing_date.isoformat()}&limit=100', headers=admin)
+
+    def generation(i, client):
+        generation_date = today + timedelta(days=1 + i)
+        return client.request('POST', '/api/allocations/generate', headers=admin, payload={
+            'date': generation_date.isoformat(), 'time_slots': list(TIME_SLOTS), 'faculty_per_venue': args.per_venue})
+
+    def bulk_import(i, client):
+        lines = ['faculty_id,name,mobile_number,email_id,rfid_tag,is_admin']
+        for faculty_id in range(2, min(args.import_rows, args.faculty - 1) + 2):
+            row = faculty_row(faculty_id)
+            lines.append(f"{faculty_id},Faculty {faculty_id} r{i},{row['mobile_number']},{row['email_id']},{row['rfid_tag']},no")
+        content = io.BytesIO('\n'.join(lines).encode('utf-8'))
+        return client.request('POST', '/api/bulk-import/faculty', headers=admin, files={'file': (content, 'faculty.csv')})
+
+    def export(export_format):
+        def run(i, client):
+            return client.request('GET', f'/api/attendance_records?date={export_date}&export={export_format}', headers=admin)
+        return run
+
+    scenarios = {'login': login, 'checkin': checkin, 'listing': listing, 'generation': generation,
+                 'import': bulk_import, 'export_csv': export('csv'), 'export_xlsx': export('xlsx'),
+                 'export_pdf': export('pdf')}
+    limits = {'checkin': len(open_allocations)}
+    return scenarios, limits
+
+
+def login_token(app, faculty_id):
+    status, body = TestClient(app).request('POST', '/api/login', payload={
+        'email': f'faculty{faculty_id}@bench.local', 'password': f'9{faculty_id:09d}'})
+    return json.loads(body)['token']
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(run, iterations, concurrency, make_client):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    clients = threading.local()
+
+    def call(i):
+        nonlocal errors
+        if not hasattr(clients, 'client'):
+            clients.client = make_client()
+        start = time.perf_counter()
+        status, _ = run(i, clients.client)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(iterations)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'throughput_per_s': round(iterations / wall, 2) if wall else None,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else None
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    lines = []
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        ratios = [f"{key} {before[key]:.2f} -> {result[key]:.2f} ms ({result[key] / before[key]:.2f}x)"
+                  for key in ('p50_ms', 'p99_ms') if before.get(key) and result.get(key)]
+        lines.append(f"{name:12} " + ', '.join(ratios))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    database = args.database or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='benchmark-'), 'benchmark.db')}"
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        METRICS_SLOW_REQUEST_MS = 0
+
+    from app import create_app
+    app = create_app(BenchmarkConfig)
+    today = date.today()
+
+    started = time.perf_counter()
+    with app.app_context():
+        scale = seed(args, today)
+    seed_seconds = time.perf_counter() - started
+
+    server = serve(app) if args.http else None
+    make_client = (lambda: HttpClient(server.server_port)) if server else (lambda: TestClient(app))
+    scenarios, limits = build_scenarios(args, today, app)
+
+    results = {}
+    for name in [s.strip() for s in args.scenarios.split(',') if s.strip()]:
+        if name not in scenarios:
+            sys.exit(f'Unknown scenario: {name}')
+        iterations = min(args.iterations or ITERATIONS[name], limits.get(name, sys.maxsize))
+        results[name] = run_scenario(scenarios[name], iterations, args.concurrency, make_client)
+        print(f"{name:12} p50 {results[name]['p50_ms']} ms, p99 {results[name]['p99_ms']} ms, "
+              f"{results[name]['throughput_per_s']}/s, {results[name]['errors']} errors", file=sys.stderr)
+    if server:
+        server.shutdown()
+
+    report = {
+        'commit': git_commit(),
+        'database': database.split(':', 1)[0],
+        'client': 'http' if args.http else 'test_client',
+        'concurrency': args.concurrency,
+        'scale': scale,
+        'seed_seconds': round(seed_seconds, 3),
+        'scenarios': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
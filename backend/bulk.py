@@ -0,0 +1,38 @@
+# backend/bulk.py
+# Multi-row write helpers that pick the right upsert syntax for the bound
+# database (MySQL in production, SQLite for local runs and benchmarks).
+from sqlalchemy import insert
+
+from model import db
+
+
+def upsert(model, rows, update_columns, conflict_columns):
+    """Insert rows, updating update_columns when conflict_columns already exist.
+
+    Executes a single multi-row statement; does not commit.
+    """
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        statement = mysql_insert(model).values(rows)
+        statement = statement.on_duplicate_key_update({c: statement.inserted[c] for c in update_columns})
+    elif dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(model).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={c: statement.excluded[c] for c in update_columns}
+        )
+    else:
+        statement = insert(model).values(rows)
+    db.session.execute(statement)
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,162 @@
+# backend/cache.py
+# Response cache for read-mostly endpoints. Cached bodies are keyed by a
+# per-namespace generation token, so a write only has to replace the token
+# ("faculty", "venues", ...) to make every older entry unreachable; this also
+# works unchanged when the backend is shared between processes.
+#
+# Backends implement get(key), set(key, value, ttl=None) and delete(key).
+# MemoryBackend (per-process LRU with TTL) is the default; RedisBackend wraps
+# any client with the redis-py get/set/delete API, so a local stand-in can be
+# passed in place of a real server.
+import hashlib
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app, request
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    def __init__(self, client, prefix='smart_allocation:', default_ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class ResponseCache:
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        ttl = app.config.get('CACHE_DEFAULT_TTL', 300)
+        if app.config.get('CACHE_BACKEND') == 'redis':
+            self.backend = RedisBackend.from_url(app.config['CACHE_REDIS_URL'], default_ttl=ttl)
+        else:
+            self.backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 1024), ttl)
+
+    def generation(self, namespace):
+        # A missing token (never set, expired or evicted) is replaced by a new
+        # one, which can only make older entries unreachable, never stale.
+        key = f'generation:{namespace}'
+        token = self.backend.get(key)
+        if token is None:
+            token = uuid.uuid4().hex
+            self.backend.set(key, token, ttl=0)
+        return token
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.set(f'generation:{namespace}', uuid.uuid4().hex, ttl=0)
+
+    def get_or_set(self, namespaces, key, build, ttl=None):
+        tokens = ','.join(f'{ns}={self.generation(ns)}' for ns in namespaces)
+        cache_key = f'value:{key}|{tokens}'
+        value = self.backend.get(cache_key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        if value is not None:
+            self.backend.set(cache_key, value, ttl)
+        return value
+
+    def json_response(self, namespaces, key, build, ttl=None, with_headers=False):
+        """Serve build()'s JSON payload from the cache with an ETag.
+
+        Returns None when build() returns None, so the caller can answer 404.
+        Requests carrying a matching If-None-Match get an empty 304. With
+        with_headers=True build() returns (data, headers) and the headers are
+        cached and replayed along with the body.
+        """
+        def serialize():
+            headers = {}
+            data = build()
+            if with_headers and data is not None:
+                data, headers = data
+            if data is None:
+                return None
+            body = current_app.json.dumps(data).encode('utf-8')
+            return body, hashlib.sha1(body).hexdigest(), headers
+
+        cached = self.get_or_set(namespaces, f'{key}|{request.full_path}', serialize, ttl)
+        if cached is None:
+            return None
+        body, etag, headers = cached
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers.update(headers)
+        return response
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+response_cache = ResponseCache()
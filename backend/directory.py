@@ -0,0 +1,133 @@
+# backend/directory.py
+# Listing API shared by the faculty and venue directories. Query parameters:
+#   fields=name,email_id    columns to return (the key is always included)
+#   sort=name | sort=-name  order by one sortable field, ties broken by key
+#   q=prefix                prefix search over the searchable fields (OR)
+#   limit=100&cursor=...    keyset pagination; the next cursor is returned
+#                           in the X-Next-Cursor header (and in the body in
+#                           compact mode)
+#   format=compact          {"fields": [...], "rows": [[...], ...]} instead
+#                           of one object per row
+# Without parameters the response is the full list of objects, as before.
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+from model import db, Faculty, Venue
+
+PAGE_MAX = 1000
+
+
+class DirectoryError(Exception):
+    pass
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise DirectoryError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != 2:
+        raise DirectoryError('Invalid cursor')
+    return values
+
+
+class Directory:
+    def __init__(self, model, key, fields, search, sortable):
+        self.model = model
+        self.key = key
+        # field name -> column, in default output order
+        self.fields = {name: getattr(model, name) for name in fields}
+        self.search = search
+        self.sortable = sortable
+
+    def builder(self, args):
+        """Validate request args and return a function building (data, headers)."""
+        fields = [name.strip() for name in args.get('fields', '').split(',') if name.strip()] or list(self.fields)
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown:
+            raise DirectoryError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(self.fields)}")
+        if self.key not in fields:
+            fields.insert(0, self.key)
+
+        sort = args.get('sort', self.key)
+        descending = sort.startswith('-')
+        sort = sort.lstrip('-')
+        if sort not in self.sortable:
+            raise DirectoryError(f"Cannot sort by {sort}. Sortable: {', '.join(self.sortable)}")
+
+        limit = args.get('limit')
+        if limit is not None:
+            try:
+                limit = max(1, min(int(limit), PAGE_MAX))
+            except ValueError:
+                raise DirectoryError('limit must be a number')
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+        compact = args.get('format') == 'compact'
+        prefix = args.get('q', '').strip()
+
+        return lambda: self.page(fields, sort, descending, prefix, limit, cursor, compact)
+
+    @staticmethod
+    def after(sort_column, key_column, descending, value, key):
+        # Rows after the cursor (value, key). MySQL and SQLite sort NULLs
+        # first, so they lead an ascending page and trail a descending one.
+        if descending:
+            if value is None:
+                return and_(sort_column.is_(None), key_column < key)
+            return or_(sort_column < value, and_(sort_column == value, key_column < key), sort_column.is_(None))
+        if value is None:
+            return or_(sort_column.isnot(None), and_(sort_column.is_(None), key_column > key))
+        return or_(sort_column > value, and_(sort_column == value, key_column > key))
+
+    def page(self, fields, sort, descending, prefix, limit, cursor, compact):
+        key_column = self.fields[self.key]
+        sort_column = self.fields[sort]
+        columns = [self.fields[name] for name in fields]
+        query = db.session.query(*columns, sort_column)
+
+        if prefix:
+            # startswith compiles to LIKE 'prefix%', which the column indexes serve
+            query = query.filter(or_(*[self.fields[name].startswith(prefix, autoescape=True) for name in self.search]))
+        if cursor is not None:
+            query = query.filter(self.after(sort_column, key_column, descending, *cursor))
+        # Ordering on the raw columns lets the (column, primary key) index
+        # serve the sort
+        if descending:
+            query = query.order_by(sort_column.desc(), key_column.desc())
+        else:
+            query = query.order_by(sort_column, key_column)
+        if limit is not None:
+            query = query.limit(limit)
+
+        rows = query.all()
+        next_cursor = None
+        if limit is not None and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor([last[-1], last[fields.index(self.key)]])
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        if compact:
+            return {'fields': fields, 'rows': [list(row[:-1]) for row in rows], 'next_cursor': next_cursor}, headers
+        return [dict(zip(fields, row)) for row in rows], headers
+
+
+FACULTY_DIRECTORY = Directory(
+    Faculty,
+    key='faculty_id',
+    fields=['faculty_id', 'name', 'mobile_number', 'email_id', 'rfid_tag', 'is_admin'],
+    search=['name', 'email_id', 'rfid_tag'],
+    sortable=['faculty_id', 'name', 'email_id']
+)
+
+VENUE_DIRECTORY = Directory(
+    Venue,
+    key='venue_id',
+    fields=['venue_id', 'name', 'location', 'capacity'],
+    search=['name', 'location'],
+    sortable=['venue_id', 'name', 'location', 'capacity']
+)
@@ -0,0 +1,100 @@
+# backend/events.py
+# In-process broadcaster for attendance updates. Check-ins publish small
+# events into a bounded ring buffer with increasing sequence numbers; SSE
+# streams and long-poll requests wait on a shared condition and read from
+# that buffer, so connected clients never poll the database.
+#
+# The buffer is per process, so clients only see check-ins handled by the
+# worker process they are connected to. Each open stream or long-poll holds a
+# server thread (or greenlet), so max_listeners caps how many a process
+# serves at once and leaves the rest for check-ins.
+import json
+import threading
+import time
+from collections import deque
+
+
+class AttendanceFeed:
+    def __init__(self, history=2000, max_listeners=None):
+        self._events = deque(maxlen=history)
+        self._seq = 0
+        self._condition = threading.Condition()
+        self.max_listeners = max_listeners
+        self._listeners = 0
+
+    def init_app(self, app):
+        history = app.config.get('ATTENDANCE_FEED_HISTORY')
+        if history:
+            with self._condition:
+                self._events = deque(self._events, maxlen=history)
+        self.max_listeners = app.config.get('ATTENDANCE_MAX_LISTENERS', self.max_listeners)
+
+    def join(self):
+        """Register a stream or long-poll; False when max_listeners are already open."""
+        with self._condition:
+            if self.max_listeners is not None and self._listeners >= self.max_listeners:
+                return False
+            self._listeners += 1
+            return True
+
+    def leave(self):
+        with self._condition:
+            self._listeners = max(self._listeners - 1, 0)
+
+    @property
+    def listeners(self):
+        with self._condition:
+            return self._listeners
+
+    @property
+    def cursor(self):
+        with self._condition:
+            return self._seq
+
+    def publish(self, events):
+        with self._condition:
+            for event in events:
+                self._seq += 1
+                self._events.append({'seq': self._seq, **event})
+            self._condition.notify_all()
+
+    def since(self, cursor, filters=None):
+        """Return (events after cursor matching filters, latest cursor, reset).
+
+        reset is True when events after cursor have already dropped out of the
+        buffer, meaning the client should reload its full state.
+        """
+        with self._condition:
+            return self._since(cursor, filters)
+
+    def wait(self, cursor, filters=None, timeout=25):
+        # Block until an event matching filters arrives after cursor, or timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events, latest, reset = self._since(cursor, filters)
+                remaining = deadline - time.monotonic()
+                if events or reset or remaining <= 0:
+                    return events, latest, reset
+                # Non-matching events still move the cursor forward
+                cursor = latest
+                self._condition.wait(remaining)
+
+    def _since(self, cursor, filters):
+        # The cursor is older than the buffer, or from before a restart
+        reset = cursor > self._seq or (bool(self._events) and cursor < self._events[0]['seq'] - 1)
+        events = [e for e in self._events if e['seq'] > cursor and matches(e, filters)]
+        return events, self._seq, reset
+
+
+def matches(event, filters):
+    if not filters:
+        return True
+    return all(event.get(key) == value for key, value in filters.items())
+
+
+def sse_message(event, event_type='attendance'):
+    return f"id: {event['seq']}\nevent: {event_type}\ndata: {json.dumps(event)}\n\n"
+
+
+attendance_feed = AttendanceFeed()
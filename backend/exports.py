@@ -0,0 +1,167 @@
+# backend/exports.py
+# Attendance exports that stream rows from the database in batches instead of
+# materialising the whole result: CSV is streamed straight into the response,
+# XLSX and PDF are written incrementally to a temporary file.
+import csv
+import io
+import tempfile
+
+from flask import Response, send_file, stream_with_context
+from sqlalchemy import select, union_all
+
+from model import db, Faculty, Attendance, AttendanceArchive, Venue, VenueAllocation, VenueAllocationArchive
+
+BATCH_SIZE = 1000
+
+# Column order used by the JSON, CSV and XLSX outputs
+RECORD_FIELDS = ['id', 'faculty_id', 'faculty_name', 'rfid_tag', 'allocation_id', 'venue_name', 'date', 'is_present']
+
+PDF_HEADERS = ['ID', 'Faculty', 'RFID', 'Venue', 'Date', 'Present']
+PDF_COLUMNS = [40, 90, 240, 330, 470, 540]
+PDF_ROW_HEIGHT = 14
+PDF_MAX_CHARS = 26
+
+
+def attendance_query(date_filter='all', start_date=None, end_date=None, include_archive=False):
+    """Select attendance records for one date ('all' for every date) or a range.
+
+    With include_archive the archived rows are unioned in as well.
+    """
+    def restrict(query, date_column):
+        if date_filter != 'all':
+            query = query.where(date_column == date_filter)
+        if start_date:
+            query = query.where(date_column >= start_date)
+        if end_date:
+            query = query.where(date_column <= end_date)
+        return query
+
+    hot = restrict(select(
+        Attendance.id.label('id'),
+        Attendance.faculty_id.label('faculty_id'),
+        Faculty.name.label('faculty_name'),
+        Faculty.rfid_tag.label('rfid_tag'),
+        Attendance.allocation_id.label('allocation_id'),
+        Venue.name.label('venue_name'),
+        Attendance.date.label('date'),
+        Attendance.is_present.label('is_present')
+    ).join(Faculty, Faculty.faculty_id == Attendance.faculty_id)
+        .outerjoin(VenueAllocation, VenueAllocation.allocation_id == Attendance.allocation_id)
+        .outerjoin(Venue, Venue.venue_id == VenueAllocation.venue_id), Attendance.date)
+    if not include_archive:
+        return hot.order_by(Attendance.id)
+
+    # Archived faculty may since have been removed, so their join is outer
+    cold = restrict(select(
+        AttendanceArchive.id,
+        AttendanceArchive.faculty_id,
+        Faculty.name,
+        Faculty.rfid_tag,
+        AttendanceArchive.allocation_id,
+        Venue.name,
+        AttendanceArchive.date,
+        AttendanceArchive.is_present
+    ).outerjoin(Faculty, Faculty.faculty_id == AttendanceArchive.faculty_id)
+        .outerjoin(VenueAllocationArchive, VenueAllocationArchive.allocation_id == AttendanceArchive.allocation_id)
+        .outerjoin(Venue, Venue.venue_id == VenueAllocationArchive.venue_id), AttendanceArchive.date)
+    records = union_all(cold, hot).subquery()
+    return select(records).order_by(records.c.id)
+
+
+def iter_records(query):
+    # yield_per uses a server-side cursor where the driver supports it, so
+    # only one batch of rows is held in memory at a time.
+    result = db.session.execute(query.execution_options(yield_per=BATCH_SIZE))
+    for record_id, faculty_id, faculty_name, rfid_tag, allocation_id, venue_name, date, is_present in result:
+        yield (record_id, faculty_id, faculty_name, rfid_tag, allocation_id,
+               venue_name if venue_name is not None else 'N/A', date.isoformat(), bool(is_present))
+
+
+def records_to_dicts(query):
+    return [dict(zip(RECORD_FIELDS, record)) for record in iter_records(query)]
+
+
+def export_csv(query, filename):
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(RECORD_FIELDS)
+        for count, record in enumerate(iter_records(query), start=1):
+            writer.writerow(record)
+            if count % BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+def export_xlsx(query, filename):
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Attendance')
+    sheet.append(RECORD_FIELDS)
+    for record in iter_records(query):
+        sheet.append(record)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return send_file(
+        output,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        download_name=filename,
+        as_attachment=True
+    )
+
+
+def export_pdf(query, filename):
+    # Rows are drawn directly on the canvas page by page with the header
+    # repeated on each page, rather than building one Table flowable for the
+    # whole result.
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    output = tempfile.TemporaryFile()
+    pdf = canvas.Canvas(output, pagesize=letter)
+    width, height = letter
+    top = height - 50
+    bottom = 50
+    page = 1
+
+    def draw_header():
+        pdf.setFont('Helvetica-Bold', 9)
+        for x, title in zip(PDF_COLUMNS, PDF_HEADERS):
+            pdf.drawString(x, top, title)
+        pdf.line(PDF_COLUMNS[0], top - 4, width - 40, top - 4)
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(width - 40, bottom - 20, f'Page {page}')
+        pdf.setFont('Helvetica', 9)
+
+    draw_header()
+    y = top - PDF_ROW_HEIGHT - 4
+    for record_id, _, faculty_name, rfid_tag, _, venue_name, date, is_present in iter_records(query):
+        if y < bottom:
+            pdf.showPage()
+            page += 1
+            draw_header()
+            y = top - PDF_ROW_HEIGHT - 4
+        values = [record_id, faculty_name, rfid_tag, venue_name, date, 'Yes' if is_present else 'No']
+        for x, value in zip(PDF_COLUMNS, values):
+            pdf.drawString(x, y, str(value if value is not None else '')[:PDF_MAX_CHARS])
+        y -= PDF_ROW_HEIGHT
+    pdf.save()
+    output.seek(0)
+    return send_file(output, mimetype='application/pdf', download_name=filename, as_attachment=True)
+
+
+EXPORTERS = {
+    'csv': (export_csv, 'csv'),
+    'excel': (export_xlsx, 'xlsx'),
+    'xlsx': (export_xlsx, 'xlsx'),
+    'pdf': (export_pdf, 'pdf')
+}
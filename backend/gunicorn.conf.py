@@ -0,0 +1,54 @@
+# backend/gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# The worker class defaults to gevent when it is installed: cooperative
+# greenlets for peak check-in concurrency and many open attendance streams;
+# PyMySQL is pure Python, so database calls yield to other greenlets.
+# Otherwise (or with WEB_WORKER_CLASS=gthread) requests are served from
+# WEB_THREADS threads per process; keep DB_POOL_SIZE + DB_MAX_OVERFLOW at or
+# above WEB_THREADS. Every open stream or long-poll holds one of those
+# threads, so under gthread ATTENDANCE_MAX_LISTENERS defaults to half of
+# them and further streams get a 503 instead of starving check-ins.
+#
+# The RFID index, attendance feed and job registry live in each worker
+# process, so live feeds and job status are only complete with one worker;
+# scale with threads/greenlets before adding workers.
+#
+# EventSource clients pass their token as ?jwt=; the access log redacts it.
+import importlib.util
+import os
+import re
+
+from gunicorn.glogging import Logger
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_WORKERS', 1))
+# find_spec rather than import: gevent must not be imported before the
+# worker monkey-patches
+worker_class = os.getenv('WEB_WORKER_CLASS') or ('gevent' if importlib.util.find_spec('gevent') else 'gthread')
+threads = int(os.getenv('WEB_THREADS', 8))
+worker_connections = int(os.getenv('WEB_WORKER_CONNECTIONS', 1000))
+# Read by Config when the workers load the app
+if worker_class == 'gthread':
+    os.environ.setdefault('ATTENDANCE_MAX_LISTENERS', str(max(threads // 2, 1)))
+else:
+    os.environ.setdefault('ATTENDANCE_MAX_LISTENERS', str(max(worker_connections // 2, 1)))
+timeout = int(os.getenv('WEB_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('WEB_KEEPALIVE', 5))
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+
+
+JWT_PARAM = re.compile(r'(?<=[?&]jwt=)[^&\s]*|(?<=^jwt=)[^&\s]*')
+
+
+class RedactingLogger(Logger):
+    def atoms(self, resp, req, environ, request_time):
+        atoms = super().atoms(resp, req, environ, request_time)
+        for key in ('r', 'q'):
+            if atoms.get(key):
+                atoms[key] = JWT_PARAM.sub('REDACTED', atoms[key])
+        return atoms
+
+
+logger_class = RedactingLogger
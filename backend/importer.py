@@ -0,0 +1,346 @@
+# backend/importer.py
+# Bulk import of faculty, venues and faculty unavailability from XLSX or CSV
+# uploads. Sheets are read in streaming mode and columns are matched by
+# header name. Rows are validated up front (including uniqueness within the
+# file and against the database, checked per chunk with one query per unique
+# column), and the accepted rows are written as chunked multi-row upserts.
+# Rejected rows are reported with their reasons instead of aborting the
+# whole import.
+import csv
+import io
+import re
+from datetime import date, datetime
+
+from bulk import chunked, upsert
+from model import db, Faculty, FacultyUnavailability, Venue
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+RFID_PATTERN = re.compile(r'^\d{10}$')
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+$')
+
+# Alternative header spellings accepted for each column
+HEADER_ALIASES = {
+    'email': 'email_id',
+    'mobile': 'mobile_number',
+    'phone': 'mobile_number',
+    'rfid': 'rfid_tag',
+    'admin': 'is_admin',
+    'date': 'start_date',
+    'from': 'start_date',
+    'to': 'end_date',
+    'slot': 'time_slot'
+}
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+# Converters raise ValueError with a message suitable for the report
+
+def to_int(value, minimum=None):
+    if isinstance(value, bool):
+        raise ValueError('must be a whole number')
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError('must be a whole number')
+        value = int(value)
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ValueError('must be a whole number')
+    if minimum is not None and number < minimum:
+        raise ValueError(f'must be at least {minimum}')
+    return number
+
+
+def to_text(value, max_length):
+    # Numbers typed into Excel cells come back as int/float
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    if len(text) > max_length:
+        raise ValueError(f'must be at most {max_length} characters')
+    return text
+
+
+def to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'y'):
+        return True
+    if text in ('0', 'false', 'no', 'n', ''):
+        return False
+    raise ValueError('must be true/false')
+
+
+def to_rfid(value):
+    text = to_text(value, 10)
+    if not RFID_PATTERN.match(text):
+        raise ValueError('must be a 10-digit number')
+    return text
+
+
+def to_email(value):
+    text = to_text(value, 255)
+    if not EMAIL_PATTERN.match(text):
+        raise ValueError('is not a valid email address')
+    return text
+
+
+def to_date(value):
+    # Excel date cells come back as datetime
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('must be a date in YYYY-MM-DD format')
+
+
+def to_choice(choices):
+    def convert(value):
+        text = str(value).strip()
+        if text not in choices:
+            raise ValueError(f"must be one of {', '.join(choices)}")
+        return text
+    return convert
+
+
+class ImportSpec:
+    def __init__(self, model, key, columns, required, unique=(), default=None, references=None, finalize=None):
+        self.model = model
+        self.key = key
+        # column name -> converter
+        self.columns = columns
+        self.required = required
+        self.unique = unique
+        # values used for optional columns missing from the sheet or empty
+        self.default = default or {}
+        # column name -> column of another table its values must exist in
+        self.references = references or {}
+        # called with each parsed record; fills derived values and returns
+        # a list of reasons to reject it
+        self.finalize = finalize
+
+
+FACULTY_IMPORT = ImportSpec(
+    model=Faculty,
+    key='faculty_id',
+    columns={
+        'faculty_id': lambda v: to_int(v, minimum=1),
+        'name': lambda v: to_text(v, 255),
+        'mobile_number': lambda v: to_text(v, 15),
+        'email_id': to_email,
+        'is_admin': to_bool,
+        'rfid_tag': to_rfid
+    },
+    required=['name', 'mobile_number', 'email_id'],
+    unique=['mobile_number', 'email_id', 'rfid_tag'],
+    default={'is_admin': False, 'rfid_tag': None}
+)
+
+VENUE_IMPORT = ImportSpec(
+    model=Venue,
+    key='venue_id',
+    columns={
+        'venue_id': lambda v: to_int(v, minimum=1),
+        'name': lambda v: to_text(v, 255),
+        'location': lambda v: to_text(v, 255),
+        'capacity': lambda v: to_int(v, minimum=0)
+    },
+    required=['name', 'location', 'capacity']
+)
+
+
+def finalize_unavailability(record):
+    # A single date is a one-day entry; an empty slot means the whole day
+    if record.get('end_date') is None:
+        record['end_date'] = record['start_date']
+    if record['end_date'] < record['start_date']:
+        return ['end_date must not be before start_date']
+    return []
+
+
+UNAVAILABILITY_IMPORT = ImportSpec(
+    model=FacultyUnavailability,
+    key='id',
+    columns={
+        'id': lambda v: to_int(v, minimum=1),
+        'faculty_id': lambda v: to_int(v, minimum=1),
+        'start_date': to_date,
+        'end_date': to_date,
+        'time_slot': to_choice(FacultyUnavailability.time_slot.type.enums),
+        'reason': lambda v: to_text(v, 255)
+    },
+    required=['faculty_id', 'start_date'],
+    references={'faculty_id': Faculty.faculty_id},
+    finalize=finalize_unavailability
+)
+
+
+def normalize_header(value):
+    header = str(value).strip().lower().replace(' ', '_') if value is not None else ''
+    return HEADER_ALIASES.get(header, header)
+
+
+def read_rows(file):
+    """Yield the rows of an uploaded .xlsx or .csv file as tuples, header first."""
+    filename = file.filename.lower()
+    if filename.endswith('.xlsx'):
+        import openpyxl
+        workbook = openpyxl.load_workbook(io.BytesIO(file.read()), read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield row
+        finally:
+            workbook.close()
+    elif filename.endswith('.csv'):
+        text = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+        for row in csv.reader(text):
+            yield tuple(row)
+    else:
+        raise ImportFormatError('Please upload an XLSX or CSV file')
+
+
+def map_columns(spec, header):
+    positions = {}
+    for index, value in enumerate(header):
+        name = normalize_header(value)
+        if name in spec.columns and name not in positions:
+            positions[name] = index
+    missing = [name for name in spec.required if name not in positions]
+    if missing:
+        raise ImportFormatError(
+            f"Invalid file format. Missing columns: {', '.join(missing)}. "
+            f"Supported columns: {', '.join(spec.columns)}"
+        )
+    return positions
+
+
+def parse_row(spec, positions, row):
+    record = {}
+    reasons = []
+    for name, convert in spec.columns.items():
+        index = positions.get(name)
+        value = row[index] if index is not None and index < len(row) else None
+        if value is None or (isinstance(value, str) and not value.strip()):
+            if name in spec.required:
+                reasons.append(f'{name} is required')
+            elif name != spec.key:
+                record[name] = spec.default.get(name)
+            continue
+        try:
+            record[name] = convert(value)
+        except ValueError as e:
+            reasons.append(f'{name} {e}')
+    return record, reasons
+
+
+def find_conflicts(spec, records):
+    # One query per unique column: which of these values already belong to a
+    # different row in the database?
+    conflicts = {}
+    key_column = getattr(spec.model, spec.key)
+    for name in spec.unique:
+        values = {record[name] for _, record in records if record.get(name) is not None}
+        if not values:
+            continue
+        column = getattr(spec.model, name)
+        owners = dict(db.session.query(column, key_column).filter(column.in_(values)).all())
+        for row_number, record in records:
+            owner = owners.get(record.get(name))
+            if owner is not None and owner != record.get(spec.key):
+                conflicts.setdefault(row_number, []).append(
+                    f'{name} {record[name]} already belongs to {spec.key} {owner}'
+                )
+    return conflicts
+
+
+def find_missing_references(spec, records):
+    # One query per referencing column: which values don't exist?
+    missing = {}
+    for name, column in spec.references.items():
+        values = {record[name] for _, record in records if record.get(name) is not None}
+        if not values:
+            continue
+        found = {value for (value,) in db.session.query(column).filter(column.in_(values)).all()}
+        for row_number, record in records:
+            if record.get(name) is not None and record[name] not in found:
+                missing.setdefault(row_number, []).append(f'{name} {record[name]} does not exist')
+    return missing
+
+
+def import_file(spec, file):
+    """Validate and upsert every row of file. Returns a report dict; does not commit."""
+    rows = read_rows(file)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFormatError('The file is empty')
+    positions = map_columns(spec, header)
+
+    errors = []
+    accepted = []
+    seen = {name: {} for name in [spec.key] + list(spec.unique)}
+    for row_number, row in enumerate(rows, start=2):
+        if not any(value is not None and str(value).strip() for value in row):
+            continue
+        record, reasons = parse_row(spec, positions, row)
+        if not reasons and spec.finalize:
+            reasons = spec.finalize(record)
+        for name, first_row in seen.items():
+            value = record.get(name)
+            if value is None:
+                continue
+            if value in first_row:
+                reasons.append(f'duplicate {name} {value} (also on row {first_row[value]})')
+            else:
+                first_row[value] = row_number
+        if reasons:
+            errors.append({'row': row_number, 'reasons': reasons})
+        else:
+            accepted.append((row_number, record))
+
+    inserted = 0
+    updated = 0
+    # Existing rows only get the columns that are present in the file
+    update_columns = [name for name in spec.columns if name != spec.key and name in positions]
+    key_column = getattr(spec.model, spec.key)
+    for chunk in chunked(accepted, CHUNK_SIZE):
+        conflicts = find_conflicts(spec, chunk)
+        for row_number, reasons in find_missing_references(spec, chunk).items():
+            conflicts.setdefault(row_number, []).extend(reasons)
+        valid = []
+        for row_number, record in chunk:
+            if row_number in conflicts:
+                errors.append({'row': row_number, 'reasons': conflicts[row_number]})
+            else:
+                valid.append(record)
+        if not valid:
+            continue
+
+        keys = [record[spec.key] for record in valid if record.get(spec.key) is not None]
+        existing = {key for (key,) in db.session.query(key_column).filter(key_column.in_(keys)).all()} if keys else set()
+        updated += len(existing)
+        inserted += len(valid) - len(existing)
+
+        upsert(spec.model, [
+            {name: record.get(name) for name in spec.columns}
+            for record in valid
+        ], update_columns, [spec.key])
+
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'rejected': len(errors),
+        'errors': errors[:MAX_REPORTED_ERRORS],
+        'errors_truncated': len(errors) > MAX_REPORTED_ERRORS
+    }
@@ -0,0 +1,106 @@
+# backend/jobs.py
+# Background job runner for work that is too long for a request, such as
+# generating a whole exam period. Jobs run on a small thread pool inside the
+# app process with their own app context; their state lives in memory and is
+# polled through the API.
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from model import db
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, kind, total):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.total = total
+        self.done = 0
+        self.results = []
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def advance(self, result, steps=1):
+        with self._lock:
+            self.done += steps
+            self.results.append(result)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'total': self.total,
+                'done': self.done,
+                'progress': round(self.done / self.total, 4) if self.total else 1.0,
+                'results': list(self.results),
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+
+class JobManager:
+    def __init__(self, max_workers=2, retention=3600):
+        self.max_workers = max_workers
+        self.retention = retention
+        self.app = None
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get('JOB_WORKERS', self.max_workers)
+        self.retention = app.config.get('JOB_RETENTION_SECONDS', self.retention)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            return self._executor
+
+    def submit(self, kind, total, fn, *args, **kwargs):
+        """Run fn(job, *args, **kwargs) on the pool and return the Job immediately."""
+        self._prune()
+        job = Job(kind, total)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._get_executor().submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args, kwargs):
+        with self.app.app_context():
+            job.status = 'running'
+            try:
+                fn(job, *args, **kwargs)
+                job.status = 'completed'
+            except Exception as e:
+                db.session.rollback()
+                logger.exception(f"Job {job.id} ({job.kind}) failed")
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                db.session.remove()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+
+jobs = JobManager()
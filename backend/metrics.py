@@ -0,0 +1,200 @@
+# backend/metrics.py
+# Built-in request instrumentation, cheap enough to leave on in production.
+# Every request records its latency, the number of SQL statements it ran and
+# the time spent in them (from SQLAlchemy engine events) against its route
+# pattern; exports also record their payload size. render() returns the
+# totals in the Prometheus text exposition format, together with counters
+# from other components registered with add_collector().
+#
+# Requests slower than METRICS_SLOW_REQUEST_MS (0 disables) are logged with
+# their slowest SQL statements. Latency is measured until the response is
+# returned, so streamed bodies (CSV, SSE) are not included.
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+from sqlalchemy import event
+
+from model import db
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'smart_allocation'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+SQL_LOG_CHARS = 500
+# Streams and long-polls are held open on purpose; timing them would fill the
+# top latency buckets and the slow log. They are still counted by status.
+LONG_LIVED_ROUTES = ('/api/attendance/stream', '/api/attendance/updates')
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{format_labels(labels, le=bound)} {cumulative}'
+        yield f'{name}_sum{format_labels(labels)} {self.sum:.6f}'
+        yield f'{name}_count{format_labels(labels)} {cumulative}'
+
+
+def format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+class Metrics:
+    def __init__(self):
+        self.slow_request_seconds = 1.0
+        self.slow_sql_limit = 10
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._statements = {}
+        self._db_seconds = {}
+        self._responses = {}
+        self._export_sizes = {}
+        self._sql_total = 0
+        self._sql_seconds = 0.0
+        self._collectors = []
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        self.slow_request_seconds = app.config.get('METRICS_SLOW_REQUEST_MS', 1000) / 1000
+        self.slow_sql_limit = app.config.get('METRICS_SLOW_SQL_LIMIT', self.slow_sql_limit)
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._end_request)
+
+    def add_collector(self, name, collect):
+        # collect() returns a dict; its numeric values are exported as gauges
+        self._collectors.append((name, collect))
+
+    # Recording
+
+    def _start_request(self):
+        g.metrics = {'start': time.perf_counter(), 'statements': 0, 'db_seconds': 0.0, 'sql': []}
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        with self._lock:
+            self._sql_total += 1
+            self._sql_seconds += elapsed
+        state = g.get('metrics') if g else None
+        if state is not None:
+            state['statements'] += 1
+            state['db_seconds'] += elapsed
+            if self.slow_request_seconds:
+                state['sql'].append((elapsed, statement))
+
+    def _end_request(self, response):
+        state = g.pop('metrics', None)
+        if state is None:
+            return response
+        elapsed = time.perf_counter() - state['start']
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        key = (('method', request.method), ('route', route))
+        with self._lock:
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._statements[key] = Histogram(STATEMENT_BUCKETS)
+                self._db_seconds[key] = 0.0
+            if route not in LONG_LIVED_ROUTES:
+                self._latency[key].observe(elapsed)
+            self._statements[key].observe(state['statements'])
+            self._db_seconds[key] += state['db_seconds']
+            status_key = key + (('status', response.status_code),)
+            self._responses[status_key] = self._responses.get(status_key, 0) + 1
+        if self.slow_request_seconds and elapsed >= self.slow_request_seconds and route not in LONG_LIVED_ROUTES:
+            self._log_slow_request(elapsed, response.status_code, state)
+        return response
+
+    def _log_slow_request(self, elapsed, status, state):
+        lines = [f"Slow request {request.method} {request.full_path.rstrip('?')} -> {status}: "
+                 f"{elapsed * 1000:.1f} ms, {state['statements']} SQL statements in {state['db_seconds'] * 1000:.1f} ms"]
+        for duration, statement in heapq.nlargest(self.slow_sql_limit, state['sql'], key=lambda item: item[0]):
+            lines.append(f"  {duration * 1000:.1f} ms: {' '.join(statement.split())[:SQL_LOG_CHARS]}")
+        logger.warning('\n'.join(lines))
+
+    def track_export(self, response, export_format):
+        # Sized responses (files) are recorded directly; streamed bodies are
+        # counted as they are sent and recorded when the stream is closed.
+        if response.content_length is not None:
+            self.observe_export(export_format, response.content_length)
+        elif response.is_streamed:
+            response.response = self._count_bytes(response.response, export_format)
+        return response
+
+    def _count_bytes(self, iterable, export_format):
+        size = 0
+        try:
+            for chunk in iterable:
+                size += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            self.observe_export(export_format, size)
+
+    def observe_export(self, export_format, size):
+        key = (('format', export_format),)
+        with self._lock:
+            if key not in self._export_sizes:
+                self._export_sizes[key] = Histogram(SIZE_BUCKETS)
+            self._export_sizes[key].observe(size)
+
+    # Exposition
+
+    def render(self):
+        with self._lock:
+            lines = []
+            self._render_histograms(lines, 'http_request_duration_seconds', 'Request latency by route', self._latency)
+            self._render_histograms(lines, 'http_request_sql_statements', 'SQL statements per request by route', self._statements)
+            self._render_counters(lines, 'http_request_db_seconds_total', 'Time spent in SQL by route', self._db_seconds)
+            self._render_counters(lines, 'http_responses_total', 'Responses by route and status', self._responses)
+            self._render_histograms(lines, 'export_size_bytes', 'Attendance export payload sizes', self._export_sizes)
+            self._render_counters(lines, 'db_statements_total', 'SQL statements executed', {(): self._sql_total})
+            self._render_counters(lines, 'db_seconds_total', 'Time spent executing SQL', {(): self._sql_seconds})
+        for name, collect in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'# TYPE {PREFIX}_{name}_{key} gauge')
+                    lines.append(f'{PREFIX}_{name}_{key} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_histograms(self, lines, name, help_text, histograms):
+        lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}_{name} histogram')
+        for labels, histogram in histograms.items():
+            lines.extend(histogram.lines(f'{PREFIX}_{name}', labels))
+
+    def _render_counters(self, lines, name, help_text, counters):
+        lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}_{name} counter')
+        for labels, value in counters.items():
+            lines.append(f'{PREFIX}_{name}{format_labels(labels)} {round(value, 6)}')
+
+
+metrics = Metrics()
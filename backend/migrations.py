@@ -0,0 +1,119 @@
+# backend/migrations.py
+# Schema upgrades for existing databases. db.create_all() only creates
+# missing tables, so indexes and unique keys added to the models later are
+# created here by comparing the model metadata with what the database has.
+# Foreign keys removed from the models are dropped here as well.
+#
+#   flask --app app migrate
+import logging
+
+from sqlalchemy import MetaData, Table, func, inspect, select
+from sqlalchemy.schema import DropConstraint
+
+from model import db, Attendance
+import summary
+
+logger = logging.getLogger(__name__)
+
+
+def dedupe_attendance():
+    # Keep one row per allocation before adding uq_attendance_allocation:
+    # a present row wins over an absent one, then the oldest row.
+    duplicated = [allocation_id for (allocation_id,) in
+                  db.session.query(Attendance.allocation_id)
+                  .group_by(Attendance.allocation_id)
+                  .having(func.count(Attendance.id) > 1)
+                  .all()]
+    removed = 0
+    for allocation_id in duplicated:
+        rows = db.session.query(Attendance.id) \
+            .filter(Attendance.allocation_id == allocation_id) \
+            .order_by(Attendance.is_present.desc(), Attendance.id) \
+            .all()
+        extra = [row_id for (row_id,) in rows[1:]]
+        removed += Attendance.query.filter(Attendance.id.in_(extra)).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+
+# Unique indexes whose duplicates can be cleaned up automatically. Others are
+# reported and skipped so an operator can resolve them by hand.
+RESOLVERS = {
+    'uq_attendance_allocation': dedupe_attendance
+}
+
+
+# Foreign keys the models no longer declare, as (table, constrained columns).
+# attendance_summary keeps archived days, which must not pin their venues.
+DROPPED_FOREIGN_KEYS = [
+    ('attendance_summary', ['venue_id'])
+]
+
+
+# Tables that need to be populated from existing data when first created
+BACKFILLS = {
+    'attendance_summary': summary.rebuild,
+    'faculty_attendance_summary': summary.rebuild
+}
+
+
+def count_duplicates(index):
+    columns = list(index.columns)
+    subquery = db.session.query(*columns) \
+        .group_by(*columns) \
+        .having(func.count() > 1) \
+        .subquery()
+    return db.session.query(func.count()).select_from(subquery).scalar()
+
+
+def drop_foreign_keys(table_name, columns):
+    # Returns the names of the dropped constraints on exactly these columns
+    reflected = Table(table_name, MetaData(), autoload_with=db.engine)
+    dropped = []
+    with db.engine.begin() as connection:
+        for constraint in reflected.foreign_key_constraints:
+            if constraint.name and list(constraint.column_keys) == list(columns):
+                connection.execute(DropConstraint(constraint))
+                dropped.append(constraint.name)
+    return dropped
+
+
+def upgrade():
+    """Create missing tables and indexes, drop removed foreign keys. Returns a list of report lines."""
+    report = []
+    missing = set(db.metadata.tables) - set(inspect(db.engine).get_table_names())
+    db.create_all()
+    for name in sorted(missing):
+        report.append(f'{name}: created table')
+    # The app may already have created these tables empty at startup
+    for name, backfill in BACKFILLS.items():
+        if db.session.execute(select(db.metadata.tables[name]).limit(1)).first() is None:
+            rows = backfill()
+            db.session.commit()
+            if rows:
+                report.append(f'{name}: backfilled {rows} rows')
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        existing |= {constraint['name'] for constraint in inspector.get_unique_constraints(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in existing:
+                continue
+            if index.unique:
+                duplicates = count_duplicates(index)
+                if duplicates and index.name in RESOLVERS:
+                    removed = RESOLVERS[index.name]()
+                    report.append(f'{table.name}: removed {removed} duplicate rows for {index.name}')
+                elif duplicates:
+                    report.append(f'{table.name}: skipped {index.name}, {duplicates} duplicate keys must be resolved first')
+                    continue
+            index.create(db.engine)
+            report.append(f'{table.name}: created {index.name}')
+    for table_name, columns in DROPPED_FOREIGN_KEYS:
+        for name in drop_foreign_keys(table_name, columns):
+            report.append(f'{table_name}: dropped foreign key {name}')
+    if not report:
+        report.append('Schema is up to date')
+    for line in report:
+        logger.info(line)
+    return report
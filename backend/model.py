@@ -1,7 +1,17 @@
 # backend/model.py
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    # transactions.py points read-only requests at the autocommit 'read' engine
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            bind = self.info.get('read_bind')
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # backend/model.py
 class Faculty(db.Model):
@@ -15,6 +25,12 @@ class Faculty(db.Model):
     attendances = db.relationship('Attendance', backref='faculty', lazy=True)
     allocations = db.relationship('VenueAllocation', backref='faculty', lazy=True)
 
+    __table_args__ = (
+        # Directory prefix search and sort; email_id and rfid_tag are covered
+        # by their unique indexes
+        db.Index('ix_faculty_name', 'name'),
+    )
+
 
 # backend/model.py
 class Attendance(db.Model):
@@ -28,6 +44,13 @@ class Attendance(db.Model):
     # Relationship to allocation
     allocation = db.relationship('VenueAllocation', backref='attendance', lazy=True)
 
+    __table_args__ = (
+        # One attendance row per allocation; check-in races fail on this key
+        db.Index('uq_attendance_allocation', 'allocation_id', unique=True),
+        db.Index('ix_attendance_date', 'date'),
+        db.Index('ix_attendance_faculty_date', 'faculty_id', 'date'),
+    )
+
 class Venue(db.Model):
     __tablename__ = 'venues'
     venue_id = db.Column(db.Integer, primary_key=True)
@@ -36,6 +59,11 @@ class Venue(db.Model):
     capacity = db.Column(db.Integer, nullable=False)
     allocations = db.relationship('VenueAllocation', backref='venue', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_venues_name', 'name'),
+        db.Index('ix_venues_location', 'location'),
+    )
+
 class VenueAllocation(db.Model):
     __tablename__ = 'venue_allocations'
     allocation_id = db.Column(db.Integer, primary_key=True)
@@ -44,3 +72,91 @@ class VenueAllocation(db.Model):
     date = db.Column(db.Date, nullable=False)
     time_slot = db.Column(db.Enum('08:00-12:00', '12:00-15:00'), nullable=False)
 
+    __table_args__ = (
+        # A faculty member can't be in two venues in the same slot; this also
+        # serves the non-admin listing (faculty_id, date)
+        db.Index('uq_allocation_faculty_date_slot', 'faculty_id', 'date', 'time_slot', unique=True),
+        db.Index('ix_allocation_date_slot', 'date', 'time_slot'),
+        db.Index('ix_allocation_venue_date', 'venue_id', 'date'),
+    )
+
+
+class AttendanceSummary(db.Model):
+    # Rollup of allocated/present counts per (date, venue, time_slot), kept in
+    # step with venue_allocations and attendance by summary.py. Archived days
+    # keep their rows, so venue_id has no foreign key: venues can still be
+    # removed once their history is archived.
+    __tablename__ = 'attendance_summary'
+    date = db.Column(db.Date, primary_key=True)
+    venue_id = db.Column(db.Integer, primary_key=True)
+    time_slot = db.Column(db.Enum('08:00-12:00', '12:00-15:00'), primary_key=True)
+    allocated = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+
+
+class FacultyAttendanceSummary(db.Model):
+    # The same counts per (date, time_slot, faculty), so per-faculty totals
+    # don't have to group venue_allocations. No foreign key: like the archive
+    # tables it outlives the faculty rows it counts.
+    __tablename__ = 'faculty_attendance_summary'
+    date = db.Column(db.Date, primary_key=True)
+    time_slot = db.Column(db.Enum('08:00-12:00', '12:00-15:00'), primary_key=True)
+    faculty_id = db.Column(db.Integer, primary_key=True)
+    allocated = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+
+
+class FacultyUnavailability(db.Model):
+    # A faculty member can't be allocated from start_date to end_date
+    # (inclusive), in time_slot only or all day when time_slot is NULL
+    __tablename__ = 'faculty_unavailability'
+    id = db.Column(db.Integer, primary_key=True)
+    faculty_id = db.Column(db.Integer, db.ForeignKey('faculty.faculty_id'), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    time_slot = db.Column(db.Enum('08:00-12:00', '12:00-15:00'), nullable=True)
+    reason = db.Column(db.String(255))
+
+    __table_args__ = (
+        db.Index('ix_unavailability_faculty_dates', 'faculty_id', 'start_date'),
+    )
+
+
+class RevokedToken(db.Model):
+    # Logged-out JWTs until they expire; read through auth.token_blocklist
+    __tablename__ = 'revoked_tokens'
+    jti = db.Column(db.String(64), primary_key=True)
+    expires_at = db.Column(db.Integer)  # epoch seconds (the token's exp); NULL never expires
+
+    __table_args__ = (
+        db.Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
+
+
+# Archive tables: closed terms moved out of attendance and venue_allocations
+# by archive.py. Rows keep their original ids; there are no foreign keys so
+# faculty and venues can still be removed without touching history.
+class AttendanceArchive(db.Model):
+    __tablename__ = 'attendance_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    faculty_id = db.Column(db.Integer, nullable=False)
+    allocation_id = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    is_present = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        db.Index('ix_attendance_archive_date', 'date'),
+    )
+
+
+class VenueAllocationArchive(db.Model):
+    __tablename__ = 'venue_allocations_archive'
+    allocation_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    faculty_id = db.Column(db.Integer, nullable=False)
+    venue_id = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    time_slot = db.Column(db.Enum('08:00-12:00', '12:00-15:00'), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_allocation_archive_date', 'date'),
+    )
@@ -0,0 +1,169 @@
+# backend/rfid_index.py
+# Process-local index used by the attendance check-in path. It maps RFID tags
+# to faculty and holds each day's allocations together with their attendance
+# state, so a tap can be validated without reading from the database and only
+# the attendance write remains.
+#
+# The index is per process: writes through this app invalidate it directly,
+# and day_ttl (RFID_INDEX_DAY_TTL) bounds how long the tag map and each day
+# loaded here can miss writes made by other worker processes.
+import threading
+import time
+from collections import namedtuple
+
+from model import db, Faculty, Attendance, VenueAllocation
+
+IndexedAllocation = namedtuple('IndexedAllocation', ['allocation_id', 'faculty_id', 'venue_id', 'date', 'time_slot'])
+
+# Attendance state per allocation
+NOT_MARKED = None
+ABSENT = False
+PRESENT = True
+
+
+class RfidIndex:
+    def __init__(self, day_ttl=300):
+        self.day_ttl = day_ttl
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._tags = None
+        self._faculty_ids = None
+        self._faculty_loaded_at = None
+        self._days = {}
+        # Bumped on every invalidation so a load that raced with a write is
+        # not stored over the invalidation.
+        self._generation = 0
+
+    def init_app(self, app):
+        self.day_ttl = app.config.get('RFID_INDEX_DAY_TTL', self.day_ttl)
+
+    # Lookups
+
+    def faculty_for_tag(self, rfid_tag):
+        tags, _ = self._faculty()
+        return tags.get(rfid_tag)
+
+    def has_faculty(self, faculty_id):
+        _, faculty_ids = self._faculty()
+        return faculty_id in faculty_ids
+
+    def get_allocation(self, date, allocation_id):
+        allocations, _ = self._day(date)
+        return allocations.get(allocation_id)
+
+    def preload(self, date):
+        self._faculty()
+        allocations, _ = self._day(date)
+        return len(allocations)
+
+    # Attendance state
+
+    def claim(self, date, allocation_id):
+        """Mark allocation_id present and return its previous state.
+
+        Returns PRESENT without changing anything if it was already marked,
+        so concurrent taps for the same allocation write only once.
+        """
+        with self._lock:
+            day = self._days.get(date)
+        states = day[2] if day else self._day(date)[1]
+        with self._lock:
+            previous = states.get(allocation_id, NOT_MARKED)
+            states[allocation_id] = PRESENT
+            return previous
+
+    def release(self, date, allocation_id, previous):
+        # Undo a claim whose write failed
+        with self._lock:
+            day = self._days.get(date)
+            if day:
+                day[2][allocation_id] = previous
+
+    # Invalidation
+
+    def invalidate_faculty(self):
+        with self._lock:
+            self._tags = None
+            self._faculty_ids = None
+            self._generation += 1
+
+    def invalidate_dates(self, dates=None):
+        with self._lock:
+            self._generation += 1
+            if dates is None:
+                self._days.clear()
+            else:
+                for date in dates:
+                    self._days.pop(date, None)
+
+    def clear(self):
+        self.invalidate_faculty()
+        self.invalidate_dates()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'loads': self.loads,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'tags': len(self._tags) if self._tags is not None else 0,
+                'days': sorted(date.isoformat() for date in self._days)
+            }
+
+    # Loading
+
+    def _faculty(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._tags is not None and now - self._faculty_loaded_at < self.day_ttl:
+                self.hits += 1
+                return self._tags, self._faculty_ids
+            self.misses += 1
+            generation = self._generation
+        rows = db.session.query(Faculty.faculty_id, Faculty.rfid_tag).all()
+        tags = {rfid_tag: faculty_id for faculty_id, rfid_tag in rows if rfid_tag}
+        faculty_ids = {faculty_id for faculty_id, _ in rows}
+        with self._lock:
+            if generation == self._generation:
+                self._tags = tags
+                self._faculty_ids = faculty_ids
+                self._faculty_loaded_at = now
+            self.loads += 1
+        return tags, faculty_ids
+
+    def _day(self, date):
+        now = time.monotonic()
+        with self._lock:
+            day = self._days.get(date)
+            if day and now - day[0] < self.day_ttl:
+                self.hits += 1
+                return day[1], day[2]
+            self.misses += 1
+            generation = self._generation
+        rows = db.session.query(
+            VenueAllocation.allocation_id,
+            VenueAllocation.faculty_id,
+            VenueAllocation.venue_id,
+            VenueAllocation.time_slot,
+            Attendance.is_present
+        ).outerjoin(Attendance, Attendance.allocation_id == VenueAllocation.allocation_id) \
+            .filter(VenueAllocation.date == date) \
+            .all()
+        allocations = {}
+        states = {}
+        for allocation_id, faculty_id, venue_id, time_slot, is_present in rows:
+            allocations[allocation_id] = IndexedAllocation(allocation_id, faculty_id, venue_id, date, time_slot)
+            if is_present is not None:
+                states[allocation_id] = states.get(allocation_id) or bool(is_present)
+        with self._lock:
+            if generation == self._generation:
+                self._days[date] = (now, allocations, states)
+            self.loads += 1
+        return allocations, states
+
+
+rfid_index = RfidIndex()
@@ -0,0 +1,110 @@
+# backend/startup.py
+# Worker startup helpers. Libraries that only exports, imports and analytics
+# need (openpyxl, ReportLab, NumPy) are imported inside those code paths so
+# booting a worker doesn't pay for them; warm_imports() then loads them on a
+# background thread after boot so the first export doesn't either.
+#
+#   python app.py --profile-startup
+# reports how long importing the app, create_app() and each heavy library
+# take in a fresh interpreter.
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = (
+    'openpyxl',
+    'reportlab.lib.pagesizes',
+    'reportlab.pdfgen.canvas',
+    'numpy'
+)
+
+warm_timings = {}
+
+
+def warm_imports(modules=HEAVY_MODULES, delay=0):
+    """Import modules on a daemon thread; missing optional libraries are skipped."""
+    def load():
+        if delay:
+            time.sleep(delay)
+        for name in modules:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logger.warning(f"Warm-up import of {name} failed: {e}")
+                continue
+            warm_timings[name] = round(time.perf_counter() - started, 4)
+        logger.info(f"Warm-up imports done: {warm_timings}")
+
+    thread = threading.Thread(target=load, name='warm-imports', daemon=True)
+    thread.start()
+    return thread
+
+
+def init_app(app):
+    if app.config.get('WARM_IMPORTS', True):
+        warm_imports(delay=app.config.get('WARM_IMPORTS_DELAY', 0))
+
+
+PROFILE_SCRIPT = """
+import importlib, json, sys, time
+timings = {}
+started = time.perf_counter()
+import app
+timings['import app'] = time.perf_counter() - started
+started = time.perf_counter()
+app.create_app()
+timings['create_app()'] = time.perf_counter() - started
+for name in sys.argv[1:]:
+    started = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        continue
+    timings[f'import {name}'] = time.perf_counter() - started
+print(json.dumps(timings))
+"""
+
+
+def profile_startup(limit=15):
+    """Return report lines with startup timings measured in a fresh interpreter."""
+    backend = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, WARM_IMPORTS='0')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT, *HEAVY_MODULES],
+                            cwd=backend, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'Startup profile failed:\n{result.stderr[-2000:]}')
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # -X importtime lines: "import time: self [us] | cumulative | name", with
+    # children listed (indented) before their parent; keep the modules app
+    # imports directly
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative), len(name) - len(name.lstrip()), name.strip()))
+        if name.strip() == 'app':
+            break
+    app_indent = entries[-1][1]
+    children = []
+    for cumulative, indent, name in reversed(entries[:-1]):
+        if indent <= app_indent:
+            break
+        if indent == app_indent + 2:
+            children.append((cumulative, name))
+
+    lines = [f'{label:32} {seconds * 1000:9.1f} ms' for label, seconds in timings.items()]
+    lines.append('')
+    lines.append(f'Slowest imports while loading app (cumulative, top {limit}):')
+    for us, name in sorted(children, reverse=True)[:limit]:
+        lines.append(f'  {name:30} {us / 1000:9.1f} ms')
+    return lines
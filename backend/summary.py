@@ -0,0 +1,147 @@
+# backend/summary.py
+# Attendance rollup. attendance_summary holds allocated/present counts per
+# (date, venue, time_slot) and faculty_attendance_summary per (date,
+# time_slot, faculty); both are rebuilt for the affected slots whenever
+# allocations are regenerated and incremented when attendance is marked, so
+# dashboard totals never scan attendance or venue_allocations. None of these
+# functions commit; they run inside the caller's transaction.
+from collections import Counter
+
+from sqlalchemy import and_, func, insert, update
+
+from model import db, Attendance, AttendanceArchive, AttendanceSummary, Faculty, FacultyAttendanceSummary, Venue, VenueAllocation, VenueAllocationArchive
+
+
+def present_join():
+    # attendance has at most one row per allocation (uq_attendance_allocation)
+    return and_(Attendance.allocation_id == VenueAllocation.allocation_id, Attendance.is_present.is_(True))
+
+
+# Rollup table -> the allocation column it is keyed by besides date and time_slot
+ROLLUPS = (
+    (AttendanceSummary, 'venue_id'),
+    (FacultyAttendanceSummary, 'faculty_id')
+)
+
+
+def refresh(dates=None, time_slots=None):
+    """Recompute summary rows for dates x time_slots (everything if dates is None)."""
+    rows = 0
+    for table, key in ROLLUPS:
+        delete_query = table.query
+        if dates is not None:
+            delete_query = delete_query.filter(table.date.in_(dates))
+        if time_slots is not None:
+            delete_query = delete_query.filter(table.time_slot.in_(time_slots))
+        delete_query.delete(synchronize_session=False)
+
+        query = db.session.query(
+            VenueAllocation.date,
+            VenueAllocation.time_slot,
+            getattr(VenueAllocation, key),
+            func.count(VenueAllocation.allocation_id),
+            func.count(Attendance.id)
+        ).outerjoin(Attendance, present_join())
+        if dates is not None:
+            query = query.filter(VenueAllocation.date.in_(dates))
+        if time_slots is not None:
+            query = query.filter(VenueAllocation.time_slot.in_(time_slots))
+        rows += insert_counts(table, key, query.group_by(
+            VenueAllocation.date, VenueAllocation.time_slot, getattr(VenueAllocation, key)).all())
+    return rows
+
+
+def insert_counts(table, key, rows):
+    if rows:
+        db.session.execute(insert(table), [
+            {'date': date, 'time_slot': time_slot, key: key_id, 'allocated': allocated, 'present': present_count}
+            for date, time_slot, key_id, allocated, present_count in rows
+        ])
+    return len(rows)
+
+
+def rebuild():
+    rows = refresh()
+    # Archived terms are no longer in venue_allocations; roll them up from
+    # the archive tables so their summary rows survive a rebuild
+    for table, key in ROLLUPS:
+        archived = db.session.query(
+            VenueAllocationArchive.date,
+            VenueAllocationArchive.time_slot,
+            getattr(VenueAllocationArchive, key),
+            func.count(VenueAllocationArchive.allocation_id),
+            func.count(AttendanceArchive.id)
+        ).outerjoin(AttendanceArchive, and_(AttendanceArchive.allocation_id == VenueAllocationArchive.allocation_id,
+                                            AttendanceArchive.is_present.is_(True))) \
+            .group_by(VenueAllocationArchive.date, VenueAllocationArchive.time_slot, getattr(VenueAllocationArchive, key)) \
+            .all()
+        rows += insert_counts(table, key, archived)
+    return rows
+
+
+def record_present(allocations):
+    """Count newly present allocations (objects with date, time_slot, venue_id and faculty_id)."""
+    for table, key in ROLLUPS:
+        increments = Counter((a.date, a.time_slot, getattr(a, key)) for a in allocations)
+        for (date, time_slot, key_id), count in increments.items():
+            db.session.execute(update(table)
+                               .where(table.date == date,
+                                      table.time_slot == time_slot,
+                                      getattr(table, key) == key_id)
+                               .values(present=table.present + count))
+
+
+def counts(rows):
+    return [{**keys, 'allocated': allocated, 'present': present, 'absent': allocated - present}
+            for keys, allocated, present in rows]
+
+
+def summarize(start_date=None, end_date=None, groups=('day', 'venue', 'slot', 'faculty')):
+    allocated = func.coalesce(func.sum(AttendanceSummary.allocated), 0)
+    present = func.coalesce(func.sum(AttendanceSummary.present), 0)
+
+    def rollup(*columns):
+        query = db.session.query(*columns, allocated, present)
+        if start_date:
+            query = query.filter(AttendanceSummary.date >= start_date)
+        if end_date:
+            query = query.filter(AttendanceSummary.date <= end_date)
+        if columns:
+            query = query.group_by(*columns).order_by(*columns)
+        return query.all()
+
+    total_allocated, total_present = rollup()[0]
+    result = {
+        'start_date': start_date.isoformat() if start_date else None,
+        'end_date': end_date.isoformat() if end_date else None,
+        'totals': counts([({}, total_allocated, total_present)])[0]
+    }
+    if 'day' in groups:
+        result['by_day'] = counts(({'date': date.isoformat()}, a, p)
+                                  for date, a, p in rollup(AttendanceSummary.date))
+    if 'slot' in groups:
+        result['by_slot'] = counts(({'time_slot': time_slot}, a, p)
+                                   for time_slot, a, p in rollup(AttendanceSummary.time_slot))
+    if 'venue' in groups:
+        names = dict(db.session.query(Venue.venue_id, Venue.name).all())
+        result['by_venue'] = counts(({'venue_id': venue_id, 'venue_name': names.get(venue_id)}, a, p)
+                                    for venue_id, a, p in rollup(AttendanceSummary.venue_id))
+    if 'faculty' in groups:
+        result['by_faculty'] = summarize_faculty(start_date, end_date)
+    return result
+
+
+def summarize_faculty(start_date=None, end_date=None):
+    query = db.session.query(
+        FacultyAttendanceSummary.faculty_id,
+        Faculty.name,
+        func.sum(FacultyAttendanceSummary.allocated),
+        func.sum(FacultyAttendanceSummary.present)
+    ).outerjoin(Faculty, Faculty.faculty_id == FacultyAttendanceSummary.faculty_id)
+    if start_date:
+        query = query.filter(FacultyAttendanceSummary.date >= start_date)
+    if end_date:
+        query = query.filter(FacultyAttendanceSummary.date <= end_date)
+    rows = query.group_by(FacultyAttendanceSummary.faculty_id, Faculty.name) \
+        .order_by(FacultyAttendanceSummary.faculty_id).all()
+    return counts(({'faculty_id': faculty_id, 'faculty_name': name}, int(a), int(p)) for faculty_id, name, a, p in rows)
@@ -0,0 +1,76 @@
+# backend/tests/conftest.py
+# Behaviour tests run against a throwaway SQLite database.
+# Run from backend/:  python -m pytest tests
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from model import db, Faculty, Venue, VenueAllocation  # noqa: E402
+
+DAY = date(2026, 3, 2)
+MORNING = '08:00-12:00'
+AFTERNOON = '12:00-15:00'
+
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app
+    from auth import role_cache, token_blocklist
+    from availability import availability_index
+    from rfid_index import rfid_index
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        WARM_IMPORTS = False
+        METRICS_SLOW_REQUEST_MS = 0
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        # The indexes and caches are process-wide singletons (create_app gives
+        # response_cache a fresh backend)
+        rfid_index.clear()
+        availability_index.invalidate()
+        role_cache.invalidate()
+        token_blocklist.invalidate()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def seeded(app):
+    """Five faculty (ids 1-5, tags 1000000001-5), two venues and four morning allocations on DAY."""
+    import summary
+    for faculty_id in range(1, 6):
+        db.session.add(Faculty(faculty_id=faculty_id, name=f'F{faculty_id}', mobile_number=f'900000000{faculty_id}',
+                               email_id=f'f{faculty_id}@example.com', rfid_tag=f'100000000{faculty_id}'))
+    db.session.add_all([Venue(venue_id=1, name='Hall A', location='Block 1', capacity=30),
+                        Venue(venue_id=2, name='Hall B', location='Block 2', capacity=60)])
+    for allocation_id, faculty_id, venue_id in [(1, 1, 1), (2, 2, 1), (3, 3, 2), (4, 4, 2)]:
+        db.session.add(VenueAllocation(allocation_id=allocation_id, faculty_id=faculty_id, venue_id=venue_id,
+                                       date=DAY, time_slot=MORNING))
+    db.session.flush()
+    summary.rebuild()
+    db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Test client signed in as an admin (faculty_id 99)."""
+    from auth import issue_token
+    admin = Faculty(faculty_id=99, name='Admin', mobile_number='9000000099', email_id='admin@example.com',
+                    rfid_tag='1000000099', is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {issue_token(admin)}'
+    # Requests share this app context's session; start them without an open
+    # transaction, as they would in a server
+    db.session.remove()
+    return client
@@ -0,0 +1,208 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+
+from allocation import AllocationError, plan_allocations, plan_changes, venue_requirements
+from conftest import AFTERNOON, DAY, MORNING
+from model import db, Attendance, Faculty, Venue, VenueAllocation
+
+
+def slots(days=1, time_slots=(MORNING, AFTERNOON)):
+    return [(DAY + timedelta(days=offset), time_slot) for offset in range(days) for time_slot in time_slots]
+
+
+# venue_requirements
+
+def test_requirements_are_flat_without_scaling():
+    assert venue_requirements([(1, 10), (2, 500)], 2) == [(1, 2), (2, 2)]
+
+
+def test_scaled_requirements_follow_capacity():
+    assert venue_requirements([(1, 10), (2, 20), (3, 31)], 3, scale_by_capacity=True) == [(1, 1), (2, 3), (3, 5)]
+
+
+@pytest.mark.parametrize('venues, faculty_per_venue', [
+    ([(1, 1), (2, 1), (3, 1000)], 1),
+    ([(venue_id, 1) for venue_id in range(9)] + [(9, 1000)], 1),
+    ([(1, 0), (2, 0), (3, 5), (4, 900)], 2),
+])
+def test_scaled_requirements_keep_the_total_and_one_per_venue(venues, faculty_per_venue):
+    requirements = venue_requirements(venues, faculty_per_venue, scale_by_capacity=True)
+    assert sum(count for _, count in requirements) == len(venues) * faculty_per_venue
+    assert all(count >= 1 for _, count in requirements)
+
+
+def test_scaling_without_capacity_falls_back_to_flat():
+    assert venue_requirements([(1, 0), (2, None)], 2, scale_by_capacity=True) == [(1, 2), (2, 2)]
+
+
+# Solvers
+
+@pytest.mark.parametrize('strategy', ['greedy', 'random'])
+def test_every_venue_gets_distinct_faculty_per_slot(strategy):
+    rows = plan_allocations([(1, 30), (2, 30)], list(range(1, 9)), slots(days=3), 2, strategy=strategy, seed=1)
+    assert len(rows) == 6 * 4
+    per_slot = Counter((day, time_slot) for _, _, day, time_slot in rows)
+    assert set(per_slot.values()) == {4}
+    per_venue = Counter((venue_id, day, time_slot) for _, venue_id, day, time_slot in rows)
+    assert set(per_venue.values()) == {2}
+    assert len({(faculty_id, day, time_slot) for faculty_id, _, day, time_slot in rows}) == len(rows)
+
+
+def test_greedy_spreads_duties_evenly():
+    rows = plan_allocations([(1, 30), (2, 30)], list(range(1, 9)), slots(days=4), 2, seed=7)
+    duties = Counter(faculty_id for faculty_id, _, _, _ in rows)
+    assert max(duties.values()) - min(duties.values()) <= 1
+
+
+def test_greedy_prefers_faculty_with_less_history():
+    rows = plan_allocations([(1, 30)], [1, 2, 3], slots(time_slots=(MORNING,)), 1, history={1: 5, 2: 5}, seed=3)
+    assert [faculty_id for faculty_id, _, _, _ in rows] == [3]
+
+
+def test_max_per_day_is_respected():
+    rows = plan_allocations([(1, 30)], [1, 2], slots(days=2), 1, max_per_day=1, seed=2)
+    per_day = Counter((faculty_id, day) for faculty_id, _, day, _ in rows)
+    assert set(per_day.values()) == {1}
+
+
+@pytest.mark.parametrize('strategy', ['greedy', 'random'])
+def test_unavailable_faculty_are_skipped(strategy):
+    planned = slots(days=2)
+    unavailable = {slot: {1, 2} for slot in planned[:2]}
+    rows = plan_allocations([(1, 30)], [1, 2, 3, 4], planned, 2, strategy=strategy, unavailable=unavailable, seed=5)
+    assert all(faculty_id not in (1, 2) for faculty_id, _, day, _ in rows if day == DAY)
+
+
+def test_not_enough_available_faculty_is_an_error():
+    with pytest.raises(AllocationError, match='Not enough faculty available on'):
+        plan_allocations([(1, 30)], [1, 2, 3], slots(), 2, unavailable={(DAY, MORNING): {1, 2}})
+    with pytest.raises(AllocationError, match='3 needed'):
+        plan_allocations([(1, 30), (2, 30), (3, 30)], [1, 2], slots(), 1)
+
+
+def test_invalid_arguments_are_errors():
+    with pytest.raises(AllocationError, match='Unknown allocation strategy'):
+        plan_allocations([(1, 30)], [1, 2], slots(), 1, strategy='best')
+    with pytest.raises(AllocationError, match='at least 1'):
+        plan_allocations([(1, 30)], [1, 2], slots(), 0)
+
+
+def test_same_seed_gives_the_same_plan():
+    args = ([(1, 30), (2, 30)], list(range(1, 9)), slots(days=2), 2)
+    assert plan_allocations(*args, seed=11) == plan_allocations(*args, seed=11)
+
+
+@pytest.mark.parametrize('strategy', ['greedy', 'random'])
+def test_max_per_day_counts_duties_booked_outside_the_slots(strategy):
+    booked = {DAY: {1: 1, 2: 1}}
+    rows = plan_allocations([(1, 30)], [1, 2, 3, 4], slots(time_slots=(AFTERNOON,)), 2, strategy=strategy,
+                            max_per_day=1, booked=booked, seed=4)
+    assert sorted(faculty_id for faculty_id, _, _, _ in rows) == [3, 4]
+    with pytest.raises(AllocationError, match='only 1 available'):
+        plan_allocations([(1, 30)], [1, 2, 3], slots(time_slots=(AFTERNOON,)), 2, strategy=strategy,
+                         max_per_day=1, booked=booked)
+
+
+def test_random_solver_respects_max_per_day():
+    rows = plan_allocations([(1, 30)], [1, 2, 3, 4], slots(), 2, strategy='random', max_per_day=1, seed=9)
+    assert len({faculty_id for faculty_id, _, _, _ in rows}) == 4
+
+
+# /api/allocations/generate
+
+@pytest.mark.parametrize('strategy', ['greedy', 'random'])
+def test_generating_one_slot_at_a_time_keeps_the_daily_limit(client, strategy):
+    for faculty_id in range(1, 4):
+        db.session.add(Faculty(faculty_id=faculty_id, name=f'F{faculty_id}', mobile_number=f'900000000{faculty_id}',
+                               email_id=f'f{faculty_id}@example.com'))
+    db.session.add(Venue(venue_id=1, name='Hall A', location='Block 1', capacity=30))
+    db.session.commit()
+    request = {'date': DAY.isoformat(), 'faculty_per_venue': 2, 'max_per_day': 1, 'strategy': strategy}
+
+    assert client.post('/api/allocations/generate', json={**request, 'time_slot': MORNING}).status_code == 200
+    response = client.post('/api/allocations/generate', json={**request, 'time_slot': AFTERNOON})
+    assert response.status_code == 400 and 'only 1 available' in response.get_json()['message']
+    # Regenerating the morning itself still sees all three faculty
+    assert client.post('/api/allocations/generate', json={**request, 'time_slot': MORNING}).status_code == 200
+    assert db.session.query(VenueAllocation).count() == 2
+
+
+# plan_changes: current maps slot -> [(allocation_id, faculty_id, venue_id, attended)]
+
+def changes_for(requirements, faculty_ids, current, unavailable=None, max_per_day=None, history=None, booked=None):
+    planned = sorted(current) or slots(time_slots=(MORNING,))
+    return plan_changes(requirements, faculty_ids, planned, current, history or {}, booked or {}, max_per_day,
+                        unavailable or {}, random.Random(0))
+
+
+def test_matching_allocations_are_left_alone():
+    current = {(DAY, MORNING): [(1, 1, 1, False), (2, 2, 2, False)]}
+    changes = changes_for([(1, 1), (2, 1)], [1, 2, 3], current)
+    assert changes == {'insert': [], 'update': [], 'delete': [], 'unchanged': 2}
+
+
+def test_new_venue_is_filled_by_inserting():
+    current = {(DAY, MORNING): [(1, 1, 1, False)]}
+    changes = changes_for([(1, 1), (2, 1)], [1, 2, 3], current)
+    assert changes['unchanged'] == 1
+    assert [(row['venue_id'], row['date'], row['time_slot']) for row in changes['insert']] == [(2, DAY, MORNING)]
+    assert changes['insert'][0]['faculty_id'] in (2, 3)
+
+
+def test_removed_venue_frees_its_rows_for_short_venues():
+    # Venue 2 needs two now and venue 3 is gone: its faculty moves to venue 2
+    current = {(DAY, MORNING): [(1, 1, 2, False), (2, 2, 3, False)]}
+    changes = changes_for([(2, 2)], [1, 2, 3], current)
+    assert changes['update'] == [{'allocation_id': 2, 'faculty_id': 2, 'venue_id': 2}]
+    assert changes['insert'] == [] and changes['delete'] == []
+
+
+def test_unavailable_faculty_is_replaced_reusing_the_row():
+    current = {(DAY, MORNING): [(1, 1, 1, False)]}
+    changes = changes_for([(1, 1)], [1, 2], current, unavailable={(DAY, MORNING): {1}})
+    assert changes['update'] == [{'allocation_id': 1, 'faculty_id': 2, 'venue_id': 1}]
+    assert changes['delete'] == [] and changes['unchanged'] == 0
+
+
+def test_attended_allocations_are_always_kept():
+    current = {(DAY, MORNING): [(1, 1, 1, True)]}
+    changes = changes_for([(2, 1)], [2, 3], current, unavailable={(DAY, MORNING): {1}})
+    assert changes['unchanged'] == 1
+    assert changes['delete'] == []
+    assert len(changes['insert']) == 1
+
+
+def test_fewer_seats_delete_the_surplus():
+    current = {(DAY, MORNING): [(1, 1, 1, False), (2, 2, 1, False), (3, 3, 1, False)]}
+    changes = changes_for([(1, 1)], [1, 2, 3], current)
+    assert changes['unchanged'] == 1
+    assert sorted(changes['delete']) == [2, 3]
+
+
+def test_plan_changes_reports_shortfall():
+    current = {(DAY, MORNING): [(1, 1, 1, False)]}
+    with pytest.raises(AllocationError, match='more needed'):
+        changes_for([(1, 3)], [1, 2], current)
+
+
+def test_plan_changes_counts_the_days_other_slots():
+    current = {(DAY, AFTERNOON): [(1, 1, 1, False)]}
+    changes = changes_for([(1, 1)], [1, 2], current, max_per_day=1, booked={DAY: {1: 1}})
+    assert changes['update'] == [{'allocation_id': 1, 'faculty_id': 2, 'venue_id': 1}]
+
+
+def test_incremental_generation_keeps_attended_allocations(seeded, client):
+    db.session.add(Attendance(faculty_id=1, allocation_id=1, date=DAY, is_present=True))
+    db.session.add(Venue(venue_id=3, name='Hall C', location='Block 3', capacity=30))
+    db.session.commit()
+    response = client.post('/api/allocations/generate', json={
+        'date': DAY.isoformat(), 'time_slot': MORNING, 'faculty_per_venue': 1, 'mode': 'incremental'})
+    body = response.get_json()
+    assert response.status_code == 200 and body['count'] == 3
+    assert (body['unchanged'], body['inserted'] + body['updated'], body['deleted']) == (2, 1, 1)
+    assert db.session.get(VenueAllocation, 1).faculty_id == 1
+    rows = db.session.query(VenueAllocation.venue_id).filter(VenueAllocation.date == DAY).all()
+    assert sorted(venue_id for (venue_id,) in rows) == [1, 2, 3]
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+
+import analytics
+import archive
+from conftest import DAY, MORNING
+from model import db, Attendance, VenueAllocation
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def history(seeded):
+    # Faculty 1 and 3 attended; 2 and 4 did not; faculty 5 has no duties.
+    # Allocation 5 is in the future and must not count as missed.
+    for allocation_id in (1, 3):
+        db.session.add(Attendance(faculty_id=allocation_id, allocation_id=allocation_id, date=DAY, is_present=True))
+    db.session.add(Attendance(faculty_id=2, allocation_id=2, date=DAY, is_present=False))
+    db.session.add(VenueAllocation(allocation_id=5, faculty_id=1, venue_id=1, date=date.today() + timedelta(days=30),
+                                   time_slot=MORNING))
+    db.session.commit()
+
+
+def test_gini_of_duty_counts():
+    assert analytics.gini(np.array([3, 3, 3])) == 0.0
+    assert analytics.gini(np.array([0, 0, 0, 4])) == pytest.approx(0.75)
+    assert analytics.gini(np.array([], dtype=np.int64)) == 0.0
+    assert analytics.gini(np.array([0, 0])) == 0.0
+
+
+def test_compute_rates_per_faculty_and_venue(history):
+    report = analytics.compute()
+    assert (report['allocations'], report['present'], report['absence_rate']) == (4, 2, 0.5)
+    assert [(row['faculty_id'], row['absent'], row['absence_rate']) for row in report['by_faculty']] == \
+        [(2, 1, 1.0), (4, 1, 1.0), (1, 0, 0.0), (3, 0, 0.0)]
+    assert [(row['venue_id'], row['allocated'], row['no_show_rate']) for row in report['by_venue']] == \
+        [(1, 2, 0.5), (2, 2, 0.5)]
+    fairness = report['fairness']
+    assert (fairness['faculty'], fairness['total_duties'], fairness['min'], fairness['max']) == (5, 4, 0, 1)
+    assert fairness['gini'] == pytest.approx(0.2)
+
+
+def test_compute_handles_an_empty_range(history):
+    report = analytics.compute(DAY + timedelta(days=1), DAY + timedelta(days=2))
+    assert report['allocations'] == 0 and report['by_faculty'] == [] and report['fairness']['total_duties'] == 0
+
+
+def test_archived_terms_still_count(history):
+    before = analytics.compute(end_date=DAY)
+    archive.archive_before(DAY + timedelta(days=1))
+    after = analytics.compute(end_date=DAY)
+    assert after['by_faculty'] == before['by_faculty'] and after['fairness'] == before['fairness']
+
+
+def test_analytics_endpoints(history, client):
+    body = client.get('/api/analytics/faculty?min_duties=1&threshold=0.5').get_json()
+    assert [row['faculty_id'] for row in body['chronic_absentees']] == [2, 4]
+    body = client.get(f'/api/analytics/fairness?start_date={DAY.isoformat()}&end_date={DAY.isoformat()}').get_json()
+    assert body['start_date'] == body['end_date'] == DAY.isoformat() and body['total_duties'] == 4
+    assert len(client.get('/api/analytics/venues').get_json()['venues']) == 2
+    assert client.get('/api/analytics/venues?start_date=yesterday').status_code == 400
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import archive
+import summary
+from conftest import DAY, MORNING
+from model import db, Attendance, AttendanceArchive, AttendanceSummary, Venue, VenueAllocation, VenueAllocationArchive
+
+LATER = DAY + timedelta(days=30)
+
+
+def seed_terms():
+    # Attendance on DAY (to be archived) and on LATER (current term)
+    for allocation_id in (1, 3):
+        db.session.add(Attendance(faculty_id=allocation_id, allocation_id=allocation_id, date=DAY, is_present=True))
+    db.session.add(VenueAllocation(allocation_id=5, faculty_id=5, venue_id=1, date=LATER, time_slot=MORNING))
+    db.session.add(Attendance(faculty_id=5, allocation_id=5, date=LATER, is_present=True))
+    db.session.commit()
+    return archive.archive_before(DAY + timedelta(days=1), batch_size=1)
+
+
+def record_ids(client, query=''):
+    return [record['id'] for record in client.get(f'/api/attendance_records{query}').get_json()]
+
+
+def test_archive_moves_rows_in_batches(seeded):
+    assert seed_terms() == {'attendance': 2, 'allocations': 4}
+    assert db.session.query(VenueAllocation).count() == 1 and db.session.query(Attendance).count() == 1
+    assert db.session.query(VenueAllocationArchive).count() == 4 and db.session.query(AttendanceArchive).count() == 2
+    assert archive.archived_through() == DAY
+    assert archive.is_archived(DAY) and not archive.is_archived(LATER)
+
+
+def test_records_union_the_archive_when_the_range_reaches_it(seeded, client):
+    seed_terms()
+    assert record_ids(client) == [3]
+    assert record_ids(client, '?archive=1') == [1, 2, 3]
+    assert record_ids(client, f'?date={DAY.isoformat()}') == [1, 2]
+    assert record_ids(client, f'?start_date={DAY.isoformat()}') == [1, 2, 3]
+    assert record_ids(client, f'?start_date={(DAY + timedelta(days=1)).isoformat()}') == [3]
+    # An end_date without a start_date reaches back into every archived term
+    assert record_ids(client, f'?end_date={DAY.isoformat()}') == [1, 2]
+    assert record_ids(client, f'?end_date={LATER.isoformat()}') == [1, 2, 3]
+
+
+def test_exports_follow_the_same_rule(seeded, client):
+    seed_terms()
+    body = client.get(f'/api/attendance_records?end_date={DAY.isoformat()}&export=csv').get_data(as_text=True)
+    assert len(body.splitlines()) == 3
+
+
+def test_summary_keeps_archived_days_and_their_venues_can_go(seeded, client):
+    seed_terms()
+    summary.rebuild()
+    db.session.commit()
+    totals = client.get(f'/api/attendance/summary?end_date={DAY.isoformat()}').get_json()['totals']
+    assert totals == {'allocated': 4, 'present': 2, 'absent': 2}
+
+    assert not AttendanceSummary.__table__.foreign_keys
+    assert client.delete('/api/venues/2').status_code == 200
+    assert db.session.get(Venue, 2) is None
+    assert db.session.query(AttendanceSummary).filter(AttendanceSummary.venue_id == 2).count() == 1
+
+
+def test_archived_days_cannot_be_regenerated(seeded, client):
+    seed_terms()
+    response = client.post('/api/allocations/generate', json={
+        'date': DAY.isoformat(), 'time_slot': MORNING, 'faculty_per_venue': 1})
+    assert response.status_code == 400 and 'archived term' in response.get_json()['message']
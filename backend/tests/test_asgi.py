@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('asgiref')
+
+from asgi import PooledWsgiToAsgi  # noqa: E402
+from events import attendance_feed  # noqa: E402
+
+
+def call(app, path, token):
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+             'headers': [(b'host', b'localhost'), (b'authorization', token.encode())],
+             'client': ('127.0.0.1', 5000), 'server': ('localhost', 80)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(PooledWsgiToAsgi(app)(scope, receive, send))
+    return messages
+
+
+def test_requests_run_through_the_pool(seeded, client):
+    token = client.environ_base['HTTP_AUTHORIZATION']
+    messages = call(seeded, '/api/venues', token)
+    assert messages[0]['status'] == 200
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    assert b'Hall A' in body and messages[-1] == {'type': 'http.response.body'}
+
+
+def test_finished_streams_give_back_their_listener_slot(seeded, client):
+    seeded.config.update(ATTENDANCE_STREAM_MAX_SECONDS=0.1, ATTENDANCE_STREAM_KEEPALIVE=0.05)
+    token = client.environ_base['HTTP_AUTHORIZATION']
+    messages = call(seeded, '/api/attendance/stream', token)
+    assert messages[0]['status'] == 200
+    assert attendance_feed.listeners == 0
@@ -0,0 +1,72 @@
+import time
+
+from auth import RoleCache, TokenBlocklist, issue_token, role_cache
+from model import db, Faculty, RevokedToken
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def login(client, faculty_id):
+    response = client.post('/api/login', json={'email': f'f{faculty_id}@example.com',
+                                               'password': f'900000000{faculty_id}'})
+    return response.get_json()['token']
+
+
+def test_logout_revokes_only_that_token(seeded, client):
+    first, second = login(client, 1), login(client, 1)
+    assert client.get('/api/current_user', headers=bearer(first)).status_code == 200
+    assert client.post('/api/logout', headers=bearer(first)).status_code == 200
+    response = client.get('/api/current_user', headers=bearer(first))
+    assert response.status_code == 401 and response.get_json()['message'] == 'Token has been revoked'
+    assert client.get('/api/current_user', headers=bearer(second)).status_code == 200
+    assert db.session.query(RevokedToken).count() == 1
+
+
+def test_blocklist_picks_up_other_workers_revocations_after_ttl(app):
+    blocklist = TokenBlocklist(ttl=300)
+    assert not blocklist.is_revoked('elsewhere')
+    db.session.add(RevokedToken(jti='elsewhere', expires_at=int(time.time()) + 60))
+    db.session.commit()
+    assert not blocklist.is_revoked('elsewhere')
+    blocklist.ttl = 0
+    assert blocklist.is_revoked('elsewhere')
+
+
+def test_revoking_prunes_expired_rows(app):
+    blocklist = TokenBlocklist()
+    db.session.add(RevokedToken(jti='old', expires_at=int(time.time()) - 1))
+    db.session.commit()
+    blocklist.revoke('new', int(time.time()) + 60)
+    blocklist.revoke('forever')
+    db.session.commit()
+    assert sorted(jti for (jti,) in db.session.query(RevokedToken.jti)) == ['forever', 'new']
+    assert blocklist.is_revoked('new') and blocklist.is_revoked('forever') and not blocklist.is_revoked('old')
+
+
+def test_admin_routes_need_the_claim_and_the_admin_set(seeded, client):
+    assert client.get('/api/faculty').status_code == 200
+    faculty = db.session.get(Faculty, 1)
+    assert client.get('/api/faculty', headers=bearer(issue_token(faculty))).status_code == 403
+
+    # A token claiming admin stops working once the faculty member is demoted
+    faculty.is_admin = True
+    db.session.commit()
+    token = issue_token(faculty)
+    role_cache.invalidate()
+    assert client.get('/api/faculty', headers=bearer(token)).status_code == 200
+    faculty.is_admin = False
+    db.session.commit()
+    role_cache.invalidate()
+    assert client.get('/api/faculty', headers=bearer(token)).status_code == 403
+
+
+def test_role_cache_reloads_after_ttl(seeded):
+    cache = RoleCache(ttl=300)
+    assert 2 not in cache.admin_ids()
+    db.session.get(Faculty, 2).is_admin = True
+    db.session.commit()
+    assert 2 not in cache.admin_ids()
+    cache.ttl = 0
+    assert 2 in cache.admin_ids()
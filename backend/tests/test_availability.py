@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from availability import AvailabilityIndex
+from conftest import AFTERNOON, DAY, MORNING
+from model import db, FacultyUnavailability
+
+START = DAY
+
+
+def add(faculty_id, start_date, end_date, time_slot=None):
+    db.session.add(FacultyUnavailability(faculty_id=faculty_id, start_date=start_date, end_date=end_date,
+                                         time_slot=time_slot))
+    db.session.commit()
+
+
+def test_whole_day_entries_block_every_slot_in_range(seeded):
+    add(1, START, START + timedelta(days=2))
+    index = AvailabilityIndex()
+    for offset in range(3):
+        day = START + timedelta(days=offset)
+        assert not index.is_available(1, day, MORNING)
+        assert not index.is_available(1, day, AFTERNOON)
+    assert index.is_available(1, START - timedelta(days=1), AFTERNOON)
+    assert index.is_available(1, START + timedelta(days=3), MORNING)
+    assert index.is_available(2, START, MORNING)
+
+
+def test_slot_entries_block_only_that_slot(seeded):
+    add(2, START, START + timedelta(days=1), AFTERNOON)
+    index = AvailabilityIndex()
+    assert index.is_available(2, START, MORNING)
+    assert not index.is_available(2, START, AFTERNOON)
+    assert not index.is_available(2, START + timedelta(days=1), AFTERNOON)
+    assert index.is_available(2, START + timedelta(days=1), MORNING)
+
+
+def test_unavailable_maps_slots_to_blocked_faculty(seeded):
+    add(1, START, START)
+    add(2, START, START, MORNING)
+    add(3, START - timedelta(days=30), START - timedelta(days=1))
+    index = AvailabilityIndex()
+    slots = [(START, MORNING), (START, AFTERNOON), (START + timedelta(days=1), MORNING)]
+    assert index.unavailable(slots) == {
+        (START, MORNING): {1, 2},
+        (START, AFTERNOON): {1},
+        (START + timedelta(days=1), MORNING): set()
+    }
+
+
+def test_dates_before_the_earliest_entry_are_available(seeded):
+    add(1, START, START)
+    index = AvailabilityIndex()
+    assert index.is_available(1, date(2020, 1, 1), MORNING)
+    assert index.unavailable([(date(2020, 1, 1), MORNING)]) == {(date(2020, 1, 1), MORNING): set()}
+
+
+def test_reversed_ranges_block_nothing(seeded):
+    add(1, START, START - timedelta(days=1))
+    assert AvailabilityIndex().is_available(1, START, MORNING)
+
+
+def test_index_is_cached_until_invalidated(seeded):
+    index = AvailabilityIndex(ttl=300)
+    assert index.is_available(4, START, MORNING)
+    add(4, START, START)
+    assert index.is_available(4, START, MORNING)
+    index.invalidate()
+    assert not index.is_available(4, START, MORNING)
+    assert index.loads == 2
+    assert index.stats()['blocked_slots'] == 2
+
+
+def test_validate_reports_clashes_with_new_unavailability(seeded, client):
+    assert client.get(f'/api/allocations/validate?date={DAY.isoformat()}').get_json()['valid']
+    response = client.post('/api/unavailability', json={'faculty_id': 3, 'start_date': DAY.isoformat(),
+                                                         'time_slot': MORNING, 'reason': 'Leave'})
+    assert response.status_code == 200
+    body = client.get(f'/api/allocations/validate?date={DAY.isoformat()}').get_json()
+    assert not body['valid'] and body['checked'] == 4
+    assert [(entry['allocation_id'], entry['faculty_id']) for entry in body['unavailable']] == [(3, 3)]
+
+    body = client.get(f'/api/allocations/validate?date={DAY.isoformat()}&max_per_day=0').get_json()
+    assert body['over_limit'] == []
+    client.delete(f"/api/unavailability/{response.get_json()['id']}")
+    assert client.get(f'/api/allocations/validate?date={DAY.isoformat()}').get_json()['valid']
+
+
+def test_generation_skips_unavailable_faculty(seeded, client):
+    client.post('/api/unavailability', json={'faculty_id': 1, 'start_date': DAY.isoformat()})
+    client.post('/api/unavailability', json={'faculty_id': 2, 'start_date': DAY.isoformat(), 'time_slot': AFTERNOON})
+    response = client.post('/api/allocations/generate', json={
+        'date': DAY.isoformat(), 'time_slots': [MORNING, AFTERNOON], 'faculty_per_venue': 1})
+    assert response.status_code == 200
+    assert client.get(f'/api/allocations/validate?date={DAY.isoformat()}').get_json()['valid']
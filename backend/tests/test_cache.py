@@ -0,0 +1,85 @@
+import time
+
+from cache import MemoryBackend, RedisBackend, ResponseCache
+
+
+class DictRedis:
+    # Local stand-in with the redis-py get/set/delete API
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    assert backend.get('a') == 1
+    backend.set('c', 3)
+    assert backend.get('b') is None and backend.get('a') == 1 and backend.get('c') == 3
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryBackend(default_ttl=0.01)
+    backend.set('a', 1)
+    backend.set('b', 2, ttl=0)
+    time.sleep(0.02)
+    assert backend.get('a') is None and backend.get('b') == 2
+
+
+def test_invalidating_a_namespace_rebuilds_only_its_entries():
+    for backend in (MemoryBackend(), RedisBackend(DictRedis())):
+        cache = ResponseCache(backend)
+        builds = []
+
+        def build(value):
+            builds.append(value)
+            return value
+
+        assert cache.get_or_set(['venues'], 'v', lambda: build('v1')) == 'v1'
+        assert cache.get_or_set(['faculty', 'venues'], 'fv', lambda: build('fv1')) == 'fv1'
+        assert cache.get_or_set(['venues'], 'v', lambda: build('v2')) == 'v1'
+        cache.invalidate('faculty')
+        assert cache.get_or_set(['venues'], 'v', lambda: build('v3')) == 'v1'
+        assert cache.get_or_set(['faculty', 'venues'], 'fv', lambda: build('fv2')) == 'fv2'
+        assert builds == ['v1', 'fv1', 'fv2']
+
+
+def test_none_is_not_cached():
+    cache = ResponseCache()
+    assert cache.get_or_set(['venues'], 'missing', lambda: None) is None
+    assert cache.get_or_set(['venues'], 'missing', lambda: 'found') == 'found'
+
+
+def test_listing_etag_survives_reads_and_changes_on_writes(seeded, client):
+    first = client.get('/api/venues')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and len(first.get_json()) == 2
+
+    repeat = client.get('/api/venues', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304 and repeat.headers['ETag'] == etag
+
+    client.post('/api/venues', json={'name': 'Hall C', 'location': 'Block 3', 'capacity': 40})
+    changed = client.get('/api/venues', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert [venue['name'] for venue in changed.get_json()] == ['Hall A', 'Hall B', 'Hall C']
+
+
+def test_cached_pages_replay_their_cursor_header(seeded, client):
+    first = client.get('/api/faculty?sort=-faculty_id&limit=2&fields=name')
+    again = client.get('/api/faculty?sort=-faculty_id&limit=2&fields=name')
+    assert again.get_data() == first.get_data()
+    assert again.headers['X-Next-Cursor'] == first.headers['X-Next-Cursor']
+
+    assert [row['faculty_id'] for row in first.get_json()] == [99, 5]
+    client.delete('/api/faculty/5')
+    after_delete = client.get('/api/faculty?sort=-faculty_id&limit=2&fields=name').get_json()
+    assert [row['faculty_id'] for row in after_delete] == [99, 4]
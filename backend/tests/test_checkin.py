@@ -0,0 +1,107 @@
+import threading
+
+from conftest import DAY
+from model import db, Attendance, AttendanceSummary, Faculty, VenueAllocation
+from rfid_index import NOT_MARKED, PRESENT, RfidIndex
+import summary
+
+
+def tap(allocation_id, faculty_id):
+    return {'date': DAY.isoformat(), 'allocation_id': allocation_id, 'rfid_tag': f'100000000{faculty_id}'}
+
+
+def present_total():
+    return db.session.query(db.func.sum(AttendanceSummary.present)).scalar()
+
+
+# RfidIndex claims
+
+def test_claim_returns_the_previous_state_once(seeded):
+    index = RfidIndex()
+    assert index.get_allocation(DAY, 1).faculty_id == 1
+    assert index.claim(DAY, 1) is NOT_MARKED
+    assert index.claim(DAY, 1) is PRESENT
+
+
+def test_release_restores_the_claim(seeded):
+    index = RfidIndex()
+    previous = index.claim(DAY, 2)
+    index.release(DAY, 2, previous)
+    assert index.claim(DAY, 2) is NOT_MARKED
+
+
+def test_concurrent_claims_let_one_tap_through(seeded):
+    index = RfidIndex()
+    index.preload(DAY)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index.claim(DAY, 3))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(NOT_MARKED) == 1 and results.count(PRESENT) == 7
+
+
+def test_index_loads_existing_attendance(seeded):
+    db.session.add(Attendance(faculty_id=4, allocation_id=4, date=DAY, is_present=True))
+    db.session.commit()
+    assert RfidIndex().claim(DAY, 4) is PRESENT
+
+
+def test_tag_map_expires_like_the_days(seeded):
+    # Faculty written by another worker show up once day_ttl has passed
+    index = RfidIndex(day_ttl=300)
+    assert index.faculty_for_tag('1000000001') == 1
+    db.session.add(Faculty(faculty_id=6, name='F6', mobile_number='9000000006', email_id='f6@example.com',
+                           rfid_tag='1000000006'))
+    db.session.get(Faculty, 1).rfid_tag = None
+    db.session.commit()
+    assert index.faculty_for_tag('1000000006') is None
+
+    index.day_ttl = 0
+    assert index.faculty_for_tag('1000000006') == 6
+    assert index.faculty_for_tag('1000000001') is None
+    assert index.has_faculty(6)
+
+
+# Check-in routes
+
+def test_single_check_in_validates_the_allocation_id(seeded, client):
+    response = client.post('/api/attendance', json=tap('abc', 1))
+    assert response.status_code == 400
+    assert client.post('/api/attendance', json=tap(1, 1)).status_code == 200
+    response = client.post('/api/attendance', json=tap(1, 1))
+    assert response.status_code == 400 and 'already marked' in response.get_json()['message']
+
+
+def test_single_check_in_rejects_unknown_tags_and_other_faculty(seeded, client):
+    response = client.post('/api/attendance', json={**tap(1, 1), 'rfid_tag': '1999999999'})
+    assert response.status_code == 404
+    response = client.post('/api/attendance', json=tap(1, 2))
+    assert response.status_code == 404
+    assert present_total() == 0
+
+
+def test_batch_reports_each_tap(seeded, client):
+    response = client.post('/api/attendance/batch', json={'records': [
+        tap(1, 1), tap(1, 1), tap(2, 5), {'allocation_id': 3}, tap(404, 3)
+    ]})
+    statuses = [result['status'] for result in response.get_json()['results']]
+    assert statuses == ['marked', 'already_marked', 'invalid_allocation', 'invalid', 'invalid_allocation']
+    assert present_total() == 1
+
+
+def test_batch_does_not_recount_taps_a_stale_index_missed(seeded, client):
+    from rfid_index import rfid_index
+    rfid_index.preload(DAY)
+    # Another worker marks allocation 3 after this worker loaded the day
+    db.session.add(Attendance(faculty_id=3, allocation_id=3, date=DAY, is_present=True))
+    summary.record_present([db.session.get(VenueAllocation, 3)])
+    db.session.commit()
+
+    response = client.post('/api/attendance/batch', json={'records': [tap(3, 3), tap(4, 4)]})
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == ['already_marked', 'marked']
+    assert body['marked'] == 1
+    assert present_total() == 2
+    assert db.session.query(Attendance).count() == 2
@@ -0,0 +1,61 @@
+import pytest
+
+from directory import FACULTY_DIRECTORY, Directory, DirectoryError, decode_cursor, encode_cursor
+from model import db, Faculty
+
+# rfid_tag is nullable, so sorting on it exercises the NULL-aware cursor
+BY_TAG = Directory(Faculty, key='faculty_id', fields=['faculty_id', 'rfid_tag'], search=['rfid_tag'],
+                   sortable=['rfid_tag'])
+
+
+def walk(directory, **args):
+    args = {key: str(value) for key, value in args.items()}
+    seen = []
+    while True:
+        rows, headers = directory.builder(args)()
+        seen.extend(row[directory.key] for row in rows)
+        if 'X-Next-Cursor' not in headers:
+            return seen
+        args['cursor'] = headers['X-Next-Cursor']
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(['Hall A', 3])) == ['Hall A', 3]
+    assert decode_cursor(encode_cursor([None, 1])) == [None, 1]
+    for cursor in ('!!!', encode_cursor({'a': 1}), encode_cursor([1])):
+        with pytest.raises(DirectoryError, match='Invalid cursor'):
+            decode_cursor(cursor)
+
+
+def test_builder_validates_arguments(app):
+    with pytest.raises(DirectoryError, match='Unknown fields: salary'):
+        FACULTY_DIRECTORY.builder({'fields': 'name,salary'})
+    with pytest.raises(DirectoryError, match='Cannot sort by mobile_number'):
+        FACULTY_DIRECTORY.builder({'sort': 'mobile_number'})
+    with pytest.raises(DirectoryError, match='limit must be a number'):
+        FACULTY_DIRECTORY.builder({'limit': 'ten'})
+
+
+def test_pages_cover_every_row_once(seeded):
+    assert walk(FACULTY_DIRECTORY, sort='-name', limit=2) == [5, 4, 3, 2, 1]
+    assert walk(FACULTY_DIRECTORY, sort='email_id', limit=3) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ('rfid_tag', [2, 4, 5, 1, 3]),
+    ('-rfid_tag', [3, 1, 5, 4, 2]),
+])
+@pytest.mark.parametrize('limit', [1, 2, 3])
+def test_pages_walk_through_null_sort_values(seeded, sort, expected, limit):
+    for faculty_id in (2, 4):
+        db.session.get(Faculty, faculty_id).rfid_tag = None
+    db.session.get(Faculty, 1).rfid_tag = '3000000001'
+    db.session.get(Faculty, 3).rfid_tag = '3000000003'
+    db.session.commit()
+    assert walk(BY_TAG, sort=sort, limit=limit) == expected
+
+
+def test_prefix_search_and_compact_format(seeded):
+    data, headers = FACULTY_DIRECTORY.builder({'q': 'f3@', 'fields': 'name', 'format': 'compact'})()
+    assert data == {'fields': ['faculty_id', 'name'], 'rows': [[3, 'F3']], 'next_cursor': None}
+    assert headers == {}
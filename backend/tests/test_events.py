@@ -0,0 +1,72 @@
+from conftest import DAY
+from events import AttendanceFeed, attendance_feed
+
+
+def tap(allocation_id, faculty_id):
+    return {'date': DAY.isoformat(), 'allocation_id': allocation_id, 'rfid_tag': f'100000000{faculty_id}'}
+
+
+def test_feed_returns_events_after_the_cursor():
+    feed = AttendanceFeed(history=10)
+    feed.publish([{'venue_id': 1}, {'venue_id': 2}, {'venue_id': 1}])
+    events, latest, reset = feed.since(1)
+    assert [event['seq'] for event in events] == [2, 3] and latest == 3 and not reset
+    events, _, _ = feed.since(0, {'venue_id': 1})
+    assert [event['seq'] for event in events] == [1, 3]
+
+
+def test_feed_signals_reset_for_lost_or_future_cursors():
+    feed = AttendanceFeed(history=2)
+    feed.publish([{'n': n} for n in range(5)])
+    assert feed.since(1)[2] is True
+    assert feed.since(3)[2] is False
+    assert feed.since(9)[2] is True
+
+
+def test_feed_wait_times_out_without_matching_events():
+    feed = AttendanceFeed()
+    feed.publish([{'venue_id': 2}])
+    events, latest, reset = feed.wait(0, {'venue_id': 1}, timeout=0.05)
+    assert events == [] and latest == 1 and not reset
+
+
+def test_feed_caps_listeners():
+    feed = AttendanceFeed(max_listeners=1)
+    assert feed.join() and not feed.join()
+    feed.leave()
+    assert feed.join()
+
+
+def test_stream_resumes_from_a_query_cursor(seeded, client):
+    seeded.config.update(ATTENDANCE_STREAM_MAX_SECONDS=0.2, ATTENDANCE_STREAM_KEEPALIVE=0.1)
+    cursor = attendance_feed.cursor
+    client.post('/api/attendance', json=tap(1, 1))
+    body = client.get(f'/api/attendance/stream?cursor={cursor}').get_data(as_text=True)
+    assert f'id: {cursor + 1}\nevent: attendance' in body
+
+
+def test_stream_prefers_last_event_id(seeded, client):
+    seeded.config.update(ATTENDANCE_STREAM_MAX_SECONDS=0.2, ATTENDANCE_STREAM_KEEPALIVE=0.1)
+    client.post('/api/attendance', json=tap(1, 1))
+    cursor = attendance_feed.cursor
+    client.post('/api/attendance', json=tap(3, 3))
+    body = client.get('/api/attendance/stream?cursor=0', headers={'Last-Event-ID': str(cursor)}).get_data(as_text=True)
+    assert f'id: {cursor}\n' not in body and f'id: {cursor + 1}\nevent: attendance' in body
+
+
+def test_long_poll_returns_events_after_the_cursor(seeded, client):
+    cursor = client.get('/api/attendance/updates').get_json()['cursor']
+    client.post('/api/attendance', json=tap(2, 2))
+    body = client.get(f'/api/attendance/updates?cursor={cursor}&timeout=0').get_json()
+    assert body['cursor'] == cursor + 1 and not body['reset']
+    assert [event['allocation_id'] for event in body['events']] == [2]
+    assert client.get(f'/api/attendance/updates?cursor={cursor}&timeout=0&venue_id=2').get_json()['events'] == []
+
+
+def test_listener_cap_answers_503(seeded, client):
+    attendance_feed.max_listeners = 0
+    try:
+        response = client.get(f'/api/attendance/updates?cursor={attendance_feed.cursor}&timeout=0')
+    finally:
+        attendance_feed.max_listeners = None
+    assert response.status_code == 503 and 'Retry-After' in response.headers
@@ -0,0 +1,61 @@
+import csv
+import io
+from datetime import timedelta
+
+import pytest
+
+import exports
+from conftest import DAY, MORNING
+from model import db, Attendance, VenueAllocation
+
+
+@pytest.fixture
+def records(seeded):
+    for allocation_id, faculty_id, is_present in [(1, 1, True), (2, 2, False), (3, 3, True), (4, 4, True)]:
+        db.session.add(Attendance(faculty_id=faculty_id, allocation_id=allocation_id, date=DAY, is_present=is_present))
+    db.session.add(VenueAllocation(allocation_id=5, faculty_id=5, venue_id=2, date=DAY + timedelta(days=1),
+                                   time_slot=MORNING))
+    db.session.add(Attendance(faculty_id=5, allocation_id=5, date=DAY + timedelta(days=1), is_present=True))
+    db.session.commit()
+
+
+def test_csv_is_streamed_in_batches(records, client, monkeypatch):
+    monkeypatch.setattr(exports, 'BATCH_SIZE', 2)
+    response = client.get('/api/attendance_records?export=csv')
+    assert response.status_code == 200 and response.is_streamed
+    assert response.headers['Content-Disposition'] == 'attachment; filename=attendance_all.csv'
+    chunks = list(response.response)
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert rows[0] == exports.RECORD_FIELDS
+    assert rows[1] == ['1', '1', 'F1', '1000000001', '1', 'Hall A', DAY.isoformat(), 'True']
+    assert rows[5] == ['5', '5', 'F5', '1000000005', '5', 'Hall B', (DAY + timedelta(days=1)).isoformat(), 'True']
+
+
+def test_json_and_csv_agree_on_filters(records, client):
+    records = client.get(f'/api/attendance_records?start_date={DAY.isoformat()}&end_date={DAY.isoformat()}').get_json()
+    assert [record['id'] for record in records] == [1, 2, 3, 4]
+    assert records[1]['is_present'] is False
+    body = client.get(f'/api/attendance_records?date={DAY.isoformat()}&export=csv').get_data(as_text=True)
+    assert len(body.splitlines()) == 5
+
+
+def test_xlsx_is_written_row_by_row(records, client):
+    import openpyxl
+    response = client.get('/api/attendance_records?export=xlsx')
+    assert response.status_code == 200
+    sheet = openpyxl.load_workbook(io.BytesIO(response.get_data())).active
+    rows = list(sheet.values)
+    assert list(rows[0]) == exports.RECORD_FIELDS and len(rows) == 6
+
+
+def test_pdf_pages_repeat_the_header(records, client, monkeypatch):
+    monkeypatch.setattr(exports, 'PDF_ROW_HEIGHT', 300)
+    response = client.get('/api/attendance_records?export=pdf')
+    assert response.status_code == 200 and response.get_data().startswith(b'%PDF')
+    assert response.get_data().count(b'/Type /Page\n') > 1
+
+
+def test_unknown_format_and_bad_dates_are_rejected(records, client):
+    assert client.get('/api/attendance_records?export=docx').status_code == 400
+    assert client.get('/api/attendance_records?date=02-03-2026').status_code == 400
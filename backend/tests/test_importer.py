@@ -0,0 +1,125 @@
+import io
+from datetime import date, datetime
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from importer import (FACULTY_IMPORT, UNAVAILABILITY_IMPORT, VENUE_IMPORT, ImportFormatError, import_file,
+                      map_columns, parse_row, to_bool, to_date, to_email, to_int, to_rfid, to_text)
+from model import db, Faculty, FacultyUnavailability, Venue
+
+
+def csv_file(text, filename='upload.csv'):
+    return FileStorage(stream=io.BytesIO(text.encode('utf-8')), filename=filename)
+
+
+# Converters
+
+def test_to_int_accepts_whole_numbers_only():
+    assert to_int(' 42 ') == 42
+    assert to_int(7.0) == 7
+    for value in ('4.5', 4.5, True, 'ten'):
+        with pytest.raises(ValueError, match='whole number'):
+            to_int(value)
+    with pytest.raises(ValueError, match='at least 1'):
+        to_int(0, minimum=1)
+
+
+def test_to_text_trims_and_limits_length():
+    assert to_text('  Hall A ', 10) == 'Hall A'
+    assert to_text(9876543210.0, 15) == '9876543210'
+    with pytest.raises(ValueError, match='at most 3'):
+        to_text('abcd', 3)
+
+
+def test_to_bool_parses_common_spellings():
+    assert [to_bool(v) for v in ('yes', 'Y', '1', 1, True, 'no', '', 0)] == [True] * 5 + [False] * 3
+    with pytest.raises(ValueError):
+        to_bool('maybe')
+
+
+def test_rfid_email_and_date_validation():
+    assert to_rfid(1234567890) == '1234567890'
+    with pytest.raises(ValueError, match='10-digit'):
+        to_rfid('12345')
+    assert to_email('a@b.c') == 'a@b.c'
+    with pytest.raises(ValueError, match='valid email'):
+        to_email('not an email')
+    assert to_date('2026-03-02') == date(2026, 3, 2)
+    assert to_date(datetime(2026, 3, 2, 9, 30)) == date(2026, 3, 2)
+    with pytest.raises(ValueError, match='YYYY-MM-DD'):
+        to_date('02/03/2026')
+
+
+# Header mapping and row parsing
+
+def test_missing_required_columns_are_reported():
+    with pytest.raises(ImportFormatError, match='Missing columns: capacity'):
+        map_columns(VENUE_IMPORT, ['Name', 'Location'])
+
+
+def test_headers_are_normalized():
+    positions = map_columns(VENUE_IMPORT, [' Name ', 'LOCATION', 'Capacity', 'ignored'])
+    assert positions == {'name': 0, 'location': 1, 'capacity': 2}
+
+
+def test_parse_row_collects_every_reason():
+    positions = map_columns(FACULTY_IMPORT, ['name', 'mobile_number', 'email_id', 'rfid_tag'])
+    record, reasons = parse_row(FACULTY_IMPORT, positions, ('', '9000000001', 'bad', '12'))
+    assert reasons == ['name is required', 'email_id is not a valid email address', 'rfid_tag must be a 10-digit number']
+    record, reasons = parse_row(FACULTY_IMPORT, positions, ('Ann', '9000000001', 'ann@x.org', ''))
+    assert reasons == []
+    assert record == {'name': 'Ann', 'mobile_number': '9000000001', 'email_id': 'ann@x.org',
+                      'is_admin': False, 'rfid_tag': None}
+
+
+# Whole files
+
+def test_import_rejects_unsupported_and_empty_files(app):
+    with pytest.raises(ImportFormatError, match='XLSX or CSV'):
+        import_file(VENUE_IMPORT, csv_file('name', filename='venues.txt'))
+    with pytest.raises(ImportFormatError, match='empty'):
+        import_file(VENUE_IMPORT, csv_file(''))
+
+
+def test_import_reports_bad_rows_and_keeps_good_ones(app):
+    report = import_file(VENUE_IMPORT, csv_file(
+        'name,location,capacity\n'
+        'Hall A,Block 1,30\n'
+        'Hall B,Block 2,-5\n'
+        ',,\n'
+        'Hall C,Block 3,many\n'
+    ))
+    db.session.commit()
+    assert report['inserted'] == 1 and report['rejected'] == 2
+    assert report['errors'] == [{'row': 3, 'reasons': ['capacity must be at least 0']},
+                                {'row': 5, 'reasons': ['capacity must be a whole number']}]
+    assert [name for (name,) in db.session.query(Venue.name)] == ['Hall A']
+
+
+def test_import_detects_duplicates_within_the_file_and_the_database(seeded):
+    report = import_file(FACULTY_IMPORT, csv_file(
+        'name,mobile_number,email_id,rfid_tag\n'
+        'New One,9111111111,new@example.com,2000000001\n'
+        'New Two,9111111111,two@example.com,2000000002\n'
+        'New Three,9222222222,f1@example.com,2000000003\n'
+    ))
+    db.session.commit()
+    assert [error['row'] for error in report['errors']] == [3, 4]
+    assert report['errors'][0]['reasons'] == ['duplicate mobile_number 9111111111 (also on row 2)']
+    assert report['errors'][1]['reasons'] == ['email_id f1@example.com already belongs to faculty_id 1']
+    assert db.session.query(Faculty).filter(Faculty.email_id == 'new@example.com').count() == 1
+
+
+def test_unavailability_import_checks_references_and_ranges(seeded):
+    report = import_file(UNAVAILABILITY_IMPORT, csv_file(
+        'faculty_id,start_date,end_date,time_slot\n'
+        '1,2026-03-02,,\n'
+        '99,2026-03-02,2026-03-03,\n'
+        '2,2026-03-05,2026-03-04,\n'
+        '3,2026-03-02,2026-03-02,evening\n'
+    ))
+    db.session.commit()
+    assert [error['row'] for error in report['errors']] == [3, 4, 5]
+    entry = db.session.query(FacultyUnavailability).one()
+    assert (entry.faculty_id, entry.start_date, entry.end_date, entry.time_slot) == (1, date(2026, 3, 2), date(2026, 3, 2), None)
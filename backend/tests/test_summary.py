@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import summary
+from conftest import AFTERNOON, DAY, MORNING
+from model import db, AttendanceSummary, FacultyAttendanceSummary, VenueAllocation
+
+
+def rollup_rows():
+    return {
+        'venue': sorted(db.session.query(AttendanceSummary.date, AttendanceSummary.time_slot, AttendanceSummary.venue_id,
+                                         AttendanceSummary.allocated, AttendanceSummary.present)),
+        'faculty': sorted(db.session.query(FacultyAttendanceSummary.date, FacultyAttendanceSummary.time_slot,
+                                           FacultyAttendanceSummary.faculty_id, FacultyAttendanceSummary.allocated,
+                                           FacultyAttendanceSummary.present))
+    }
+
+
+def rebuilt_rows():
+    summary.rebuild()
+    db.session.flush()
+    return rollup_rows()
+
+
+def tap(allocation_id, faculty_id):
+    return {'date': DAY.isoformat(), 'allocation_id': allocation_id, 'rfid_tag': f'100000000{faculty_id}'}
+
+
+def test_rebuild_counts_allocations_per_venue_and_faculty(seeded):
+    rows = rollup_rows()
+    assert rows['venue'] == [(DAY, MORNING, 1, 2, 0), (DAY, MORNING, 2, 2, 0)]
+    assert [row[2:] for row in rows['faculty']] == [(1, 1, 0), (2, 1, 0), (3, 1, 0), (4, 1, 0)]
+
+
+def test_check_ins_keep_the_rollup_equal_to_a_rebuild(seeded, client):
+    client.post('/api/attendance', json=tap(1, 1))
+    client.post('/api/attendance/batch', json={'records': [tap(3, 3), tap(4, 4), tap(3, 3)]})
+    incremental = rollup_rows()
+    assert incremental['venue'] == [(DAY, MORNING, 1, 2, 1), (DAY, MORNING, 2, 2, 2)]
+    assert incremental == rebuilt_rows()
+
+
+def test_refresh_only_touches_the_given_slots(seeded):
+    db.session.add(VenueAllocation(allocation_id=5, faculty_id=5, venue_id=1, date=DAY, time_slot=AFTERNOON))
+    db.session.query(AttendanceSummary).filter(AttendanceSummary.venue_id == 2).update({'present': 7})
+    summary.refresh([DAY], [AFTERNOON])
+    rows = rollup_rows()['venue']
+    assert (DAY, AFTERNOON, 1, 1, 0) in rows
+    assert (DAY, MORNING, 2, 2, 7) in rows
+
+
+def test_summary_endpoint_groups_and_filters(seeded, client):
+    client.post('/api/attendance', json=tap(2, 2))
+    body = client.get('/api/attendance/summary').get_json()
+    assert body['totals'] == {'allocated': 4, 'present': 1, 'absent': 3}
+    assert body['by_venue'][0] == {'venue_id': 1, 'venue_name': 'Hall A', 'allocated': 2, 'present': 1, 'absent': 1}
+    assert body['by_slot'] == [{'time_slot': MORNING, 'allocated': 4, 'present': 1, 'absent': 3}]
+    assert body['by_faculty'][1] == {'faculty_id': 2, 'faculty_name': 'F2', 'allocated': 1, 'present': 1, 'absent': 0}
+
+    later = (DAY + timedelta(days=1)).isoformat()
+    body = client.get(f'/api/attendance/summary?start_date={later}&groups=day').get_json()
+    assert body['totals'] == {'allocated': 0, 'present': 0, 'absent': 0}
+    assert body['by_day'] == [] and 'by_venue' not in body
+    assert client.get('/api/attendance/summary?end_date=tomorrow').status_code == 400
@@ -0,0 +1,106 @@
+# backend/transactions.py
+# Request-scoped unit of work. Write routes commit exactly once themselves;
+# nothing is committed on the way out and any transaction still open when the
+# request ends is rolled back. GET requests are read-only: their session is
+# bound to the autocommit 'read' engine (see config.read_bind), so they open
+# no transaction at all and end without a ROLLBACK round trip; flushing
+# changes from one is an error, since autocommit would persist them.
+# Each request records how many transactions it opened, committed and rolled
+# back and how long they were open; the totals are kept in transaction_stats
+# and each response carries a Server-Timing header (transactions committed or
+# still open by the time the response is built).
+import logging
+import threading
+import time
+
+from flask import g, request
+from sqlalchemy import event
+
+from model import db
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_METHODS = ('GET', 'HEAD')
+
+
+class TransactionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {'requests': 0, 'transactions': 0, 'commits': 0, 'rollbacks': 0, 'seconds': 0.0}
+
+    def record(self, stats):
+        with self._lock:
+            self.totals['requests'] += 1
+            for key in ('transactions', 'commits', 'rollbacks', 'seconds'):
+                self.totals[key] += stats[key]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.totals)
+
+
+transaction_stats = TransactionStats()
+
+
+def current_stats():
+    return g.get('db_transactions') if g else None
+
+
+def on_begin(session, transaction, connection):
+    stats = current_stats()
+    if stats is not None:
+        stats['transactions'] += 1
+        stats['_started'] = time.perf_counter()
+
+
+def on_end(kind):
+    def listener(session):
+        stats = current_stats()
+        if stats is not None and stats.get('_started') is not None:
+            stats[kind] += 1
+            stats['seconds'] += time.perf_counter() - stats.pop('_started')
+    return listener
+
+
+def on_flush(session, flush_context, instances):
+    if g and g.get('read_only_request') and (session.new or session.dirty or session.deleted):
+        raise RuntimeError(f"{request.method} {request.path} tried to write in a read-only request")
+
+
+def init_app(app):
+    event.listen(db.session, 'after_begin', on_begin)
+    event.listen(db.session, 'after_commit', on_end('commits'))
+    event.listen(db.session, 'after_rollback', on_end('rollbacks'))
+    event.listen(db.session, 'before_flush', on_flush)
+
+    @app.before_request
+    def start_unit_of_work():
+        g.read_only_request = request.method in READ_ONLY_METHODS
+        # The session outlives the request when the caller already holds an
+        # app context (tests, CLI), so the bind is set or cleared every time
+        if g.read_only_request and 'read' in db.engines:
+            db.session().info['read_bind'] = db.engines['read']
+        else:
+            db.session().info.pop('read_bind', None)
+        g.db_transactions = {'transactions': 0, 'commits': 0, 'rollbacks': 0, 'seconds': 0.0}
+
+    @app.after_request
+    def report_unit_of_work(response):
+        stats = g.get('db_transactions')
+        if stats is not None:
+            response.headers.add('Server-Timing', f"db;dur={stats['seconds'] * 1000:.2f};desc=\"{stats['transactions']} tx\"")
+        return response
+
+    @app.teardown_request
+    def end_unit_of_work(exc):
+        # Runs before Flask-SQLAlchemy removes the session. Anything left
+        # uncommitted (errors, read-only requests) is rolled back, not committed.
+        if db.session().in_transaction():
+            db.session.rollback()
+        g.pop('read_only_request', None)
+        stats = g.pop('db_transactions', None)
+        if stats is not None:
+            transaction_stats.record(stats)
+            logger.debug(f"{request.method} {request.path}: {stats['transactions']} transactions, "
+                         f"{stats['commits']} commits, {stats['rollbacks']} rollbacks, "
+                         f"{stats['seconds'] * 1000:.2f} ms")
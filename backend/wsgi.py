@@ -0,0 +1,7 @@
+# backend/wsgi.py
+# Production WSGI entry point:
+#   flask --app app migrate        # create/upgrade the schema (once per deploy)
+#   gunicorn -c gunicorn.conf.py wsgi:app
+from app import create_app
+
+app = create_app()